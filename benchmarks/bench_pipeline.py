@@ -0,0 +1,208 @@
+"""
+Benchmark der Hot Paths (Einlesen, Kennzahlen, Karte, Diagramme) für verschiedene Datengrößen.
+
+Aufruf aus dem Projektordner:
+    python -m benchmarks.bench_pipeline --sizes 1000 100000 1000000 --out bench.json
+    python -m benchmarks.bench_pipeline --sizes 1000 100000 --compare bench.json
+
+Pro Stufe werden Laufzeit (bestes von --repeat Läufen), Spitzen-Speicher und – für
+Karte/Diagramme – die Größe der an den Browser gesendeten JSON-Spezifikation gemessen.
+Speicher in drei Spalten: tracemalloc (NumPy/Pandas-Allokationen), Arrow-Speicherpool
+(pyarrow.total_allocated_bytes, sieht tracemalloc nicht – Parquet/Spaltenablage) und
+Prozess-RSS (Linux), jeweils Spitze über dem Stand vor der Stufe.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src import data
+from src.instrument import _rss_mb
+from src.metrics import build_cube, compute_kpis, compute_kpis_from_cube
+from src.timeseries import daily_series, downsample_minmax, time_series
+from src.viz import make_map, chart_flights_per_month, chart_co2_by_year, chart_co2_timeline
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Spalten wie in einer hochgeladenen CSV (ohne die abgeleiteten Zeitspalten)
+RAW_COLUMNS = data.REQUIRED_COLUMNS
+
+# Abtastintervall für Arrow-Pool und RSS (Sekunden)
+SAMPLE_INTERVAL = 0.002
+
+
+class _PeakSampler(threading.Thread):
+    """Tastet Arrow-Pool und RSS im Hintergrund ab und merkt sich die Spitzen."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self._stop_event = threading.Event()
+        self.arrow_base = pa.total_allocated_bytes()
+        self.rss_base = _rss_mb()
+        self.arrow_peak = self.arrow_base
+        self.rss_peak = self.rss_base
+
+    def sample(self) -> None:
+        self.arrow_peak = max(self.arrow_peak, pa.total_allocated_bytes())
+        rss = _rss_mb()
+        if rss is not None and self.rss_peak is not None:
+            self.rss_peak = max(self.rss_peak, rss)
+
+    def run(self) -> None:
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def stop(self) -> tuple[float, float | None]:
+        """Beendet die Abtastung; liefert (arrow_mb, rss_mb) über dem Ausgangsstand."""
+        self._stop_event.set()
+        self.join()
+        self.sample()
+        arrow_mb = (self.arrow_peak - self.arrow_base) / 1024**2
+        rss_mb = None if self.rss_base is None else self.rss_peak - self.rss_base
+        return arrow_mb, rss_mb
+
+
+def measure(fn, repeat: int = 1) -> tuple[float, dict, object]:
+    """
+    Führt fn aus und misst (sekunden, speicher, ergebnis); Zeit = bester Lauf.
+    Speicher wird im letzten Lauf gemessen, damit tracemalloc die Zeit nicht verfälscht;
+    speicher enthält peak_mb (tracemalloc), arrow_mb und rss_mb (None ohne /proc).
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    result = None
+
+    sampler = _PeakSampler()
+    sampler.start()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_mb, rss_mb = sampler.stop()
+    memory = {
+        "peak_mb": round(peak / 1024**2, 3),
+        "arrow_mb": round(arrow_mb, 3),
+        "rss_mb": None if rss_mb is None else round(rss_mb, 3),
+    }
+    return best, memory, result
+
+
+def run_size(n: int, repeat: int, workdir: str) -> list[dict]:
+    flights = data.load_flights_placeholder(n=n)
+    raw = flights[RAW_COLUMNS]
+    csv_bytes = raw.to_csv(index=False).encode("utf-8")
+    csv_path = os.path.join(workdir, f"flights_{n}.csv")
+    with open(csv_path, "wb") as f:
+        f.write(csv_bytes)
+
+    def load_csv_cold():
+        data.DATASET_CACHE.clear()
+        sidecar = data.columnar_path(csv_path)
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+        return data.load_default_csv(csv_path)
+
+    def load_columnar():
+        data.DATASET_CACHE.clear()
+        return data.load_default_csv(csv_path)
+
+    mapped = data.apply_mapping(data.normalize_column_names(data.read_csv_any(io.BytesIO(csv_bytes))), {})
+    finalized = data.finalize_df(mapped)
+    cube = build_cube(finalized)
+
+    stages = [
+        ("load_default_csv (csv)", load_csv_cold, None),
+        ("load_default_csv (columnar)", load_columnar, None),
+        ("load_default_csv (cached)", lambda: data.load_default_csv(csv_path), None),
+        ("read_csv_any", lambda: data.read_csv_any(io.BytesIO(csv_bytes)), None),
+        ("validate_flights_df", lambda: data.validate_flights_df(mapped), None),
+        ("finalize_df", lambda: data.finalize_df(mapped), None),
+        ("compute_kpis", lambda: compute_kpis(finalized), None),
+        ("build_cube", lambda: build_cube(finalized), None),
+        ("compute_kpis_from_cube", lambda: compute_kpis_from_cube(cube), None),
+        ("make_map", lambda: make_map(finalized), lambda deck: deck.to_json()),
+        ("chart_flights_per_month", lambda: chart_flights_per_month(finalized), lambda c: c.to_json()),
+        ("chart_co2_by_year", lambda: chart_co2_by_year(finalized), lambda c: c.to_json()),
+        ("chart_co2_timeline", lambda: chart_co2_timeline(
+            downsample_minmax(time_series(daily_series(finalized), "D"), ["co2_t", "co2_rolling_t"]), "Tag", "30 Tage"
+        ), lambda c: c.to_json()),
+    ]
+
+    results = []
+    for name, fn, payload in stages:
+        seconds, memory, out = measure(fn, repeat=repeat)
+        row = {"n": n, "stage": name, "seconds": round(seconds, 6), **memory}
+        if payload is not None:
+            row["payload_bytes"] = len(payload(out).encode("utf-8"))
+        results.append(row)
+        rss = "–" if memory["rss_mb"] is None else f"{memory['rss_mb']:.1f}"
+        print(f"{n:>10,}  {name:<30} {seconds * 1000:>10.1f} ms {memory['peak_mb']:>9.1f} MB"
+              f" {memory['arrow_mb']:>9.1f} MB Arrow {rss:>7} MB RSS"
+              + (f" {row['payload_bytes']:>10,} B" if "payload_bytes" in row else ""))
+    return results
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["n"], r["stage"]): r for r in json.load(f)["results"]}
+
+    print(f"\nVergleich mit {baseline_path} (Faktor > 1 = langsamer als Baseline)")
+    for r in results:
+        old = baseline.get((r["n"], r["stage"]))
+        if old is None or old["seconds"] == 0:
+            continue
+        factor = r["seconds"] / old["seconds"]
+        flag = "  ⚠" if factor > 1.2 else ""
+        print(f"{r['n']:>10,}  {r['stage']:<30} {factor:>6.2f}x{flag}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark der Privatjet-Tracker-Pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Anzahl Flüge pro Lauf")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Stufe (bester Lauf zählt)")
+    parser.add_argument("--out", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--compare", help="Mit früherem JSON-Ergebnis vergleichen")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            results.extend(run_size(n, args.repeat, workdir))
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "pyarrow": pa.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nErgebnisse gespeichert: {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Import-Zeit beim Kaltstart: Wie lange braucht ein frischer Python-Prozess, bis eine Seite
+ihre erste Ausgabe machen kann bzw. ein Modul importiert ist?
+
+Aufruf aus dem Projektordner:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 7 --scale 1.5 --top 15
+
+Für Seiten zählen nur die Imports vor der ersten Anweisung (spätere Imports, z. B. src.viz im
+Dashboard, laufen erst, wenn die Kopfzeile schon angezeigt wird). Liegt eine Messung über dem
+Budget, endet das Skript mit Exit-Code 1 (z. B. für CI).
+"""
+import argparse
+import ast
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget in ms (Median, frischer Prozess) – mit --scale an langsamere Maschinen anpassen
+IMPORT_BUDGET_MS = {
+    "app.py": 700,
+    "pages/1_Dashboard.py": 1300,
+    "pages/2_Datenquellen.py": 1300,
+    "src.data": 900,
+    "src.report": 900,
+    "src.viz": 1400,
+}
+
+
+def header_imports(page: str) -> str:
+    """
+    Import-Anweisungen am Anfang einer Seite (bis zur ersten anderen Anweisung).
+    """
+    with open(os.path.join(ROOT, page), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    imports = []
+    for node in tree.body:
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            break
+        imports.append(ast.unparse(node))
+    return "\n".join(imports)
+
+
+def import_code(target: str) -> str:
+    return header_imports(target) if target.endswith(".py") else f"import {target}"
+
+
+def measure_ms(code: str) -> float:
+    script = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{code}\n"
+        "print((time.perf_counter() - _start) * 1000)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_packages(code: str, top: int) -> list[tuple[int, str]]:
+    """
+    Pakete mit der größten kumulierten Importzeit (python -X importtime), in ms.
+    """
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match and "." not in match[2] and not match[2].startswith("_") and match[2] != "site":
+            rows.append((int(match[1]) // 1000, match[2]))  # nur Pakete, keine Untermodule
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-Zeiten der Seiten und Module gegen ein Budget prüfen")
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen pro Ziel (Median zählt)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Faktor auf alle Budgets")
+    parser.add_argument("--top", type=int, default=0, help="Langsamste Pakete pro Ziel anzeigen")
+    args = parser.parse_args(argv)
+
+    over = 0
+    for target, budget in IMPORT_BUDGET_MS.items():
+        code = import_code(target)
+        median = statistics.median(measure_ms(code) for _ in range(args.repeat))
+        limit = budget * args.scale
+        flag = "ok" if median <= limit else "ÜBER BUDGET"
+        over += median > limit
+        print(f"{target:<26} {median:>8.0f} ms   Budget {limit:>6.0f} ms   {flag}")
+        for ms, module in slowest_packages(code, args.top):
+            print(f"{'':<28}{ms:>6} ms  {module}")
+
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,21 +2,39 @@ import streamlit as st
 
 from src.styles import apply_global_style
 from src.data import (
+    CSV_PATH,
+    DATASET_CACHE,
+    file_fingerprint,
+    upload_fingerprint,
+    mapping_fingerprint,
     load_flights_placeholder,
-    read_csv_any,
-    normalize_column_names,
     auto_map_columns,
-    apply_mapping,
-    validate_flights_df,
-    finalize_df,
-    load_default_csv,
+    load_default_dataset,
+    build_airport_dim,
+    append_flights,
+    load_upload_raw,
+    prepare_upload,
+    is_large_upload,
+    read_csv_preview,
+    prepare_upload_streamed,
+    validation_table,
+    make_query,
+    query_frame,
+    query_fingerprint,
 )
-from src.metrics import compute_kpis, compare_to_small_city
-from src.viz import make_map, chart_flights_per_month, chart_co2_by_year
+from src.preview import show_preview
+from src.instrument import start_run, finish_run, fragment_run, span, prometheus_text
+from src.catalog import CATALOG_DIR, scan_catalog, catalog_years, prune, partitions_fingerprint, load_partitions
+from src.metrics import (
+    build_cube, update_cube, filter_cube, compute_kpis_from_cube, compute_trip_kpis, compare_to_small_city,
+)
+from src.trips import build_trips, link_legs
+from src.timeseries import ROLLING_WINDOWS, daily_series, downsample_minmax, time_series
 
 # ✅ Muss ganz oben stehen
 st.set_page_config(page_title="Dashboard – Privatjet-Tracker", page_icon="📊", layout="wide")
 apply_global_style()
+timings = start_run()  # Laufzeit-Messungen dieses Durchlaufs (siehe src.instrument)
 
 # =======================
 # Header
@@ -40,12 +58,32 @@ use_demo = st.sidebar.toggle(
 )
 
 
+# Flotten-Katalog (data/flights/tail=…/year=…): nur Verzeichnis-Scan, Dateien werden erst bei Auswahl gelesen
+catalog = scan_catalog(CATALOG_DIR)
+use_catalog = (
+    not catalog.empty
+    and (uploaded is None or use_demo)
+    and st.sidebar.radio("Datenquelle", ["Flotten-Katalog", "Standard-Datensatz (Drake)"]) == "Flotten-Katalog"
+)
+
+# Flughafen- und Distanz-Filter (Widgets unter „Weitere Filter“); ihre Werte stehen schon vor dem Laden
+# im Session State und können so im Katalog-Modus direkt an den Parquet-Leser gehen
+DISTANCE_RANGE = (0, 20_000)
+distance_filter = tuple(st.session_state.get("filter_distance", DISTANCE_RANGE))
+distance_query = None if distance_filter == DISTANCE_RANGE else distance_filter
+origins = st.session_state.get("filter_origin", [])
+destinations = st.session_state.get("filter_destination", [])
+
 df_all = None
+airports = None  # Flughafen-Dimension (Koordinaten), siehe build_airport_dim
+source_key = ("placeholder",)  # identifiziert den geladenen Datensatz (für abgeleitete Caches)
+year_selected = None
 
 if uploaded is not None and not use_demo:
     try:
-        raw = read_csv_any(uploaded)
-        raw = normalize_column_names(raw)
+        # Große Dateien: fürs Mapping reicht ein Ausschnitt, eingelesen wird später blockweise
+        large_upload = is_large_upload(uploaded)
+        raw = read_csv_preview(uploaded) if large_upload else load_upload_raw(uploaded)
 
         # Auto-Mapping Vorschlag
         mapping_guess = auto_map_columns(raw)
@@ -55,8 +93,10 @@ if uploaded is not None and not use_demo:
         targets = [
             "date", "origin", "destination",
             "distance_km", "flight_time_min", "co2_kg",
-            "orig_lat", "orig_lon", "dest_lat", "dest_lon"
+            "orig_lat", "orig_lon", "dest_lat", "dest_lon",
+            "aircraft_type", "tail",
         ]
+        st.sidebar.caption("Distanz, Flugdauer und CO₂ werden aus den Koordinaten berechnet, wenn sie fehlen.")
 
         for target in targets:
             options = ["— nicht zugeordnet —"] + list(raw.columns)
@@ -67,59 +107,170 @@ if uploaded is not None and not use_demo:
             if choice != "— nicht zugeordnet —":
                 mapping[target] = choice
 
-        mapped = apply_mapping(raw, mapping)
-        ok, errors = validate_flights_df(mapped)
+        if large_upload:
+            progress = st.sidebar.progress(0.0, text="CSV wird blockweise eingelesen …")
+
+            def report_progress(share, rows):
+                progress.progress(share, text=f"{rows:,} Flüge eingelesen …".replace(",", "."))
 
-        if not ok:
+            report, df_upload = prepare_upload_streamed(uploaded, mapping, on_progress=report_progress)
+            progress.empty()
+        else:
+            report, df_upload = prepare_upload(uploaded, mapping)
+
+        if not report["ok"]:
             st.sidebar.error("CSV erkannt, aber noch nicht valide.")
-            for e in errors:
+            for e in report["errors"]:
                 st.sidebar.write(f"• {e}")
+            if report["columns"]:
+                caption = "erste Zeilen" if report.get("head_only") else "Stichprobe" if report["sampled"] else "alle Zeilen"
+                st.sidebar.caption(f"Prüfbericht ({caption}, {report['checked']:,} geprüft)".replace(",", "."))
+                st.sidebar.dataframe(validation_table(report), hide_index=True)
             st.warning("Bitte Mapping/CSV korrigieren – oder Demo-Daten aktivieren.")
             df_all = load_flights_placeholder()
         else:
-            df_all = finalize_df(mapped)
+            df_all = df_upload
+            source_key = (upload_fingerprint(uploaded), mapping_fingerprint(mapping))
             st.sidebar.success(f"CSV geladen: {len(df_all):,} Flüge".replace(",", "."))
 
     except Exception as e:
         st.sidebar.error(f"Fehler beim Laden: {e}")
         df_all = load_flights_placeholder()
 
+elif use_catalog:
+    try:
+        # Flugzeug- und Jahresauswahl vor dem Laden: nicht gewählte Partitionen werden nie gelesen
+        all_tails = sorted(catalog["tail"].unique())
+        tails = st.sidebar.multiselect("Flugzeuge", all_tails, default=all_tails[:1])
+        years = catalog_years(catalog, tails)
+
+        year_mode = st.sidebar.radio("Jahresauswahl", ["Alle Jahre", "Ein Jahr"], index=0)
+        if year_mode == "Ein Jahr" and years:
+            year_selected = st.sidebar.select_slider("Jahr", options=years, value=years[-1])
+
+        partitions = prune(catalog, tails=tails, years=None if year_selected is None else [year_selected])
+        # Flughäfen und Distanz werden direkt beim Lesen der Dateien gefiltert (Jahr: über die Partitionen)
+        load_query = make_query(origins=origins, destinations=destinations, distance_km=distance_query)
+        df_all = load_partitions(partitions, query=load_query)
+        source_key = ("catalog",) + partitions_fingerprint(partitions) + query_fingerprint(load_query)
+        st.sidebar.caption(f"{len(partitions)} von {len(catalog)} Dateien geladen")
+    except Exception as e:
+        st.sidebar.error(f"Fehler beim Laden des Katalogs: {e}")
+        df_all = load_flights_placeholder()
+
 else:
     try:
-        df_all = load_default_csv()
+        df_all, airports = load_default_dataset(CSV_PATH)
+        source_key = (file_fingerprint(CSV_PATH),)
         st.sidebar.caption("Standard-Datensatz: Drake (N767CJ)")
     except Exception as e:
         st.warning("Standard-CSV konnte nicht geladen werden – Demo-Daten aktiv.")
         df_all = load_flights_placeholder()
 
+    # Neue Flüge anhängen: nur der neue Block wird verarbeitet, Cube wird nachgeführt.
+    # Eigener try-Block: eine fehlerhafte Datei lässt den Standard-Datensatz unverändert.
+    new_legs = None
+    if airports is not None:
+        new_legs = st.sidebar.file_uploader("Neue Flüge anhängen (CSV)", type=["csv"], key="append_upload")
+    if new_legs is not None:
+        base_df, base_airports, base_key = df_all, airports, source_key
+        append_key = base_key + (upload_fingerprint(new_legs),)
+
+        def build_appended():
+            base_cube = DATASET_CACHE.get_or_build(("cube",) + base_key, lambda: build_cube(base_df))
+            batch = load_upload_raw(new_legs)
+            combined, added, combined_airports, report = append_flights(
+                base_df, batch, auto_map_columns(batch), base_airports
+            )
+            return combined, combined_airports, update_cube(base_cube, added), report
+
+        try:
+            appended_df, appended_airports, cube_appended, append_report = DATASET_CACHE.get_or_build(
+                ("append",) + append_key, build_appended
+            )
+        except Exception as e:
+            st.sidebar.error(f"Neue Flüge konnten nicht gelesen werden – nicht angehängt: {e}")
+        else:
+            if append_report["ok"]:
+                df_all, airports, source_key = appended_df, appended_airports, append_key
+                DATASET_CACHE.get_or_build(("cube",) + source_key, lambda: cube_appended)
+                added = f"{append_report['added']:,}".replace(",", ".")
+                duplicates = f"{append_report['duplicates']:,}".replace(",", ".")
+                st.sidebar.success(f"{added} neue Flüge angehängt, {duplicates} Duplikate übersprungen")
+            else:
+                st.sidebar.error("Neue Flüge nicht valide – nicht angehängt.")
+                for e in append_report["errors"]:
+                    st.sidebar.write(f"• {e}")
+
 
 # =======================
 # Absicherung
 # =======================
 if df_all is None or len(df_all) == 0:
     st.warning("Keine Daten verfügbar – Demo-Daten werden geladen.")
-    df_all = load_flights_placeholder()
+    df_all, airports = load_flights_placeholder(), None
+    source_key = ("placeholder",)
+
+# Kompakte Form: Flughäfen als Kategorien, Koordinaten nur in der Flughafen-Tabelle
+if airports is None:
+    df_all, airports = DATASET_CACHE.get_or_build(("dataset",) + source_key, lambda: build_airport_dim(df_all))
 
-df = df_all.copy()
+# Flüge, deren Label nicht zur Position passt, bleiben drin, werden aber ausgewiesen
+if "geo_status" in df_all.columns:
+    n_flagged = int((df_all["geo_status"] == "abweichend").sum())
+    if n_flagged:
+        flagged = f"{n_flagged:,}".replace(",", ".")
+        st.sidebar.caption(f"⚠️ {flagged} Flüge: Flughafen-Label passt nicht zu den Koordinaten (geo_status)")
 
 # Optional: Debug (wenn es läuft, kannst du die nächsten 2 Zeilen löschen)
 # st.write("DEBUG: Anzahl Zeilen:", len(df))
 # st.dataframe(df.head(), use_container_width=True)
 
 # =======================
-# Jahresfilter (optional)
+# Jahresfilter & weitere Filter (optional)
 # =======================
-year_min, year_max = int(df["year"].min()), int(df["year"].max())
-year_mode = st.sidebar.radio("Jahresauswahl", ["Alle Jahre", "Ein Jahr"], index=0)
-
-if year_mode == "Ein Jahr":
-    year_selected = st.sidebar.slider("Jahr", year_min, year_max, year_max)
-    df = df[df["year"] == year_selected].copy()
+# Aggregat-Cube einmal pro Datensatz; KPIs und Diagramme kommen daraus statt aus den Einzelflügen
+cube_all = DATASET_CACHE.get_or_build(("cube",) + source_key, lambda: build_cube(df_all))
+cube = cube_all
+
+# Im Katalog-Modus ist das Jahr schon beim Laden gefiltert (nur passende Partitionen gelesen)
+if not use_catalog:
+    year_min, year_max = int(cube_all["year"].min()), int(cube_all["year"].max())
+    year_mode = st.sidebar.radio("Jahresauswahl", ["Alle Jahre", "Ein Jahr"], index=0)
+
+    if year_mode == "Ein Jahr":
+        year_selected = st.sidebar.slider("Jahr", year_min, year_max, year_max)
+
+with st.sidebar.expander("Weitere Filter"):
+    # Gewählte Flughäfen bleiben wählbar, auch wenn sie in den gefiltert geladenen Flügen fehlen
+    airport_labels = sorted(set(airports["label"].astype(str)) | set(origins) | set(destinations))
+    origins = st.multiselect("Startflughafen", airport_labels, key="filter_origin")
+    destinations = st.multiselect("Zielflughafen", airport_labels, key="filter_destination")
+    st.slider("Distanz (km)", *DISTANCE_RANGE, value=DISTANCE_RANGE, step=100, key="filter_distance")
+
+# Upload/Standard-Datensatz liegen schon komplett im Speicher (Cube, Anhängen, Filterlisten):
+# dort wird gefiltert statt neu gelesen. Im Katalog-Modus ist alles schon beim Laden gefiltert.
+row_query = {} if use_catalog else make_query(
+    years=None if year_selected is None else (year_selected, year_selected),
+    origins=origins,
+    destinations=destinations,
+    distance_km=distance_query,
+)
+view_key = source_key + query_fingerprint(row_query)  # Datensatz + Filter (für Karte, Diagramme, Vorschau)
+# Gefilterte Flüge einmal pro Datensatz + Filter; ohne Filter keine Kopie
+df = DATASET_CACHE.get_or_build(("view",) + view_key, lambda: query_frame(df_all, row_query)) if row_query else df_all
+
+if set(row_query) == {"years"}:
+    cube = filter_cube(cube_all, year_selected)  # reiner Jahresfilter: direkt aus dem Cube
+elif row_query:
+    cube = DATASET_CACHE.get_or_build(
+        ("cube",) + view_key, lambda: build_cube(df)
+    )
 
 # =======================
 # KPI-Kacheln
 # =======================
-flights, avg_distance, total_co2_t, avg_duration = compute_kpis(df)
+flights, avg_distance, total_co2_t, avg_duration = compute_kpis_from_cube(cube)
 
 k1, k2, k3, k4 = st.columns(4)
 k1.metric("Flüge", f"{flights:,}".replace(",", "."))
@@ -127,14 +278,48 @@ k2.metric("Ø Distanz", f"{avg_distance:,.0f} km".replace(",", "."))
 k3.metric("Gesamt-CO₂", f"{total_co2_t:,.0f} t".replace(",", "."))
 k4.metric("Ø Flugdauer", f"{avg_duration:,.0f} min".replace(",", "."))
 
+# Reisen: Flüge pro Flugzeug verkettet (Hin- und Rückflug, Zwischenstopps) – einmal pro Datensatz + Filter
+trips = DATASET_CACHE.get_or_build(("trips",) + view_key, lambda: build_trips(link_legs(df)))
+n_trips, avg_trip_co2_t, avg_ground_h, empty_legs, empty_share = compute_trip_kpis(trips)
+
+t1, t2, t3, t4 = st.columns(4)
+t1.metric("Reisen", f"{n_trips:,}".replace(",", "."))
+t2.metric("Ø CO₂ pro Reise", f"{avg_trip_co2_t:,.0f} t".replace(",", "."))
+t3.metric("Ø Bodenzeit unterwegs", f"{avg_ground_h:,.0f} h".replace(",", "."))
+t4.metric(
+    "Leerflüge (geschätzt)",
+    f"{empty_legs:,}".replace(",", "."),
+    help="Schnelles Hin und Zurück (A → B → A innerhalb von 24 h, nicht über die Heimatbasis): "
+    "der Rückflug wird als Leerflug gezählt. "
+    f"Anteil am CO₂: {empty_share:.0f} %",
+)
+
 st.divider()
 
 # =======================
 # Karte (PyDeck)
 # =======================
-st.markdown("### Flugroutenkarte (interaktiv)")
-deck = make_map(df)
-st.pydeck_chart(deck, use_container_width=True)
+# Altair/PyDeck erst hier laden: die KPI-Kacheln sind dann schon beim Browser
+from src.viz import SPEC_CACHE, map_layer_data, build_deck, chart_flights_per_month, chart_co2_by_year, chart_co2_timeline
+
+# Eigenes Fragment: ein Wechsel der Kartenansicht baut nur die Karte neu, nicht die ganze Seite
+@st.fragment
+def map_section(df, airports, trips, view_key: tuple) -> None:
+    with fragment_run("dashboard-fragment/map"):
+        st.markdown("### Flugroutenkarte (interaktiv)")
+        map_modes = {"Automatisch": "auto", "Routen (aggregiert)": "routes", "Einzelflüge": "flights", "Reisen": "trips"}
+        map_mode = st.radio("Kartenansicht", list(map_modes), horizontal=True, label_visibility="collapsed")
+        # Karte und Diagramme hängen nur von Datensatz und Filtern ab (nicht z. B. vom Kleinstadt-Vergleich):
+        # die Bögen werden einmal aggregiert und für alle Sessions mit demselben Datensatz wiederverwendet
+        layer_data = SPEC_CACHE.get_or_build(
+            ("map", map_modes[map_mode]) + view_key,
+            lambda: map_layer_data(df, mode=map_modes[map_mode], airports=airports, trips=trips),
+        )
+        with span("st.pydeck_chart"):  # Serialisierung der Karte
+            st.pydeck_chart(build_deck(layer_data), use_container_width=True)
+
+
+map_section(df, airports, trips, view_key)
 
 st.divider()
 
@@ -145,59 +330,129 @@ c1, c2 = st.columns(2)
 
 with c1:
     st.markdown("### Flüge pro Monat")
-    st.altair_chart(chart_flights_per_month(df), use_container_width=True)
+    # Vega-Lite-Spezifikation einmal pro Datensatz + Filter (to_dict prüft und serialisiert das ganze Diagramm)
+    spec = SPEC_CACHE.get_or_build(("flights_per_month",) + view_key, lambda: chart_flights_per_month(cube).to_dict())
+    with span("st.vega_lite_chart"):
+        st.vega_lite_chart(spec, use_container_width=True)
 
 with c2:
     st.markdown("### CO₂-Trend über Jahre")
-    st.altair_chart(chart_co2_by_year(df), use_container_width=True)
+    spec = SPEC_CACHE.get_or_build(("co2_by_year",) + view_key, lambda: chart_co2_by_year(cube).to_dict())
+    with span("st.vega_lite_chart"):
+        st.vega_lite_chart(spec, use_container_width=True)
 
-st.divider()
 
-# =======================
-# Vergleich: Emissionen vs. Kleinstadt
-# =======================
-st.markdown("### Vergleich: CO₂-Emissionen vs. deutsche Kleinstadt")
+# Eigenes Fragment: ein Wechsel der Auflösung baut nur dieses Diagramm neu
+@st.fragment
+def timeline_section(df, view_key: tuple) -> None:
+    with fragment_run("dashboard-fragment/timeline"):
+        st.markdown("### CO₂ im Zeitverlauf")
+        resolutions = {"Tag": "D", "Woche": "W", "Monat": "M"}
+        period = st.radio("Auflösung", list(resolutions), horizontal=True, key="timeline_freq")
+        freq = resolutions[period]
 
-st.caption("Kleinstadt in Deutschland: typischerweise **5.000–20.000 Einwohner**.")
+        def build():
+            series = time_series(daily_series(df), freq)
+            shown = downsample_minmax(series, ["co2_t", "co2_rolling_t"])
+            return chart_co2_timeline(shown, period, ROLLING_WINDOWS[freq][1]).to_dict(), len(series), len(shown)
 
-colL, colR = st.columns([1.2, 1])
+        # Tageswerte über viele Jahre werden ausgedünnt (Min/Max pro Zeitfenster), der Browser bekommt nur wenige Tausend Punkte
+        spec, n_points, n_shown = SPEC_CACHE.get_or_build(("co2_timeline", freq) + view_key, build)
+        with span("st.vega_lite_chart"):
+            st.vega_lite_chart(spec, use_container_width=True)
+        if n_shown < n_points:
+            shown = f"{n_shown:,}".replace(",", ".")
+            total = f"{n_points:,}".replace(",", ".")
+            st.caption(f"Ausgedünnt auf {shown} von {total} Punkten (Minimum/Maximum pro Zeitfenster).")
 
-with colL:
-    population = st.slider(
-        "Einwohnerzahl der Kleinstadt (für den Vergleich)",
-        min_value=5000,
-        max_value=20000,
-        value=15000,
-        step=1000
-    )
-    per_capita = st.number_input(
-        "Pro-Kopf-Emissionen (t CO₂/Jahr)",
-        min_value=1.0,
-        max_value=20.0,
-        value=8.5,
-        step=0.5
-    )
 
-small_city_t, share = compare_to_small_city(total_co2_t, population=population, per_capita_t=per_capita)
+timeline_section(df, view_key)
 
-with colR:
-    st.markdown("#### Ergebnis (aktueller Zeitraum)")
-    m1, m2 = st.columns(2)
-    m1.metric("Kleinstadt gesamt", f"{small_city_t:,.0f} t CO₂/Jahr".replace(",", "."))
-    m2.metric("Privatjet-Anteil", f"{share:,.2f} %".replace(",", "."))
-
-    # Progress-Bar (auf 0–100% begrenzt für Darstellung)
-    st.progress(min(max(share / 100, 0), 1), text=f"Anteil: {share:,.2f}%".replace(",", "."))
+st.divider()
 
-st.info(
-    f"Interpretation: Die im Dashboard ausgewählten Flüge verursachen **{total_co2_t:,.0f} t CO₂**. "
-    f"Verglichen mit einer Kleinstadt mit **{population:,} Einwohnern** (≈ {small_city_t:,.0f} t CO₂/Jahr) "
-    f"entspricht das **{share:,.2f}%** der jährlichen Stadtemissionen."
-    .replace(",", ".")
-)
+# =======================
+# Vergleich: Emissionen vs. Kleinstadt
+# =======================
+# Eigenes Fragment: Slider und Eingabefeld rechnen nur diesen Abschnitt neu
+# (Daten, Filter, Karte und Diagramme bleiben unberührt)
+@st.fragment
+def comparison_section(total_co2_t: float) -> None:
+    with fragment_run("dashboard-fragment/comparison"):
+        st.markdown("### Vergleich: CO₂-Emissionen vs. deutsche Kleinstadt")
+
+        st.caption("Kleinstadt in Deutschland: typischerweise **5.000–20.000 Einwohner**.")
+
+        colL, colR = st.columns([1.2, 1])
+
+        with colL:
+            population = st.slider(
+                "Einwohnerzahl der Kleinstadt (für den Vergleich)",
+                min_value=5000,
+                max_value=20000,
+                value=15000,
+                step=1000
+            )
+            per_capita = st.number_input(
+                "Pro-Kopf-Emissionen (t CO₂/Jahr)",
+                min_value=1.0,
+                max_value=20.0,
+                value=8.5,
+                step=0.5
+            )
+
+        small_city_t, share = compare_to_small_city(total_co2_t, population=population, per_capita_t=per_capita)
+
+        with colR:
+            st.markdown("#### Ergebnis (aktueller Zeitraum)")
+            m1, m2 = st.columns(2)
+            m1.metric("Kleinstadt gesamt", f"{small_city_t:,.0f} t CO₂/Jahr".replace(",", "."))
+            m2.metric("Privatjet-Anteil", f"{share:,.2f} %".replace(",", "."))
+
+            # Progress-Bar (auf 0–100% begrenzt für Darstellung)
+            st.progress(min(max(share / 100, 0), 1), text=f"Anteil: {share:,.2f}%".replace(",", "."))
+
+        st.info(
+            f"Interpretation: Die im Dashboard ausgewählten Flüge verursachen **{total_co2_t:,.0f} t CO₂**. "
+            f"Verglichen mit einer Kleinstadt mit **{population:,} Einwohnern** (≈ {small_city_t:,.0f} t CO₂/Jahr) "
+            f"entspricht das **{share:,.2f}%** der jährlichen Stadtemissionen."
+            .replace(",", ".")
+        )
+
+
+comparison_section(total_co2_t)
 
 # =======================
 # Datenvorschau
 # =======================
-with st.expander("🔎 Datenvorschau (Debug)"):
-    st.dataframe(df.head(50), use_container_width=True)
+@st.fragment
+def preview_section(df, view_key: tuple) -> None:
+    with fragment_run("dashboard-fragment/preview"):
+        # Blättern/Sortieren lädt nur die Tabelle neu
+        with st.expander("🔎 Datenvorschau (Debug)"):
+            show_preview(df, key="debug", cache_key=view_key)
+
+
+preview_section(df, view_key)
+
+# =======================
+# Laufzeiten (Debug)
+# =======================
+if st.sidebar.toggle("⏱️ Laufzeiten anzeigen", key="show_timings"):
+    with st.sidebar.expander("Laufzeiten dieses Durchlaufs", expanded=True):
+        st.dataframe(
+            [
+                {
+                    "Messpunkt": "· " * r["depth"] + r["name"],
+                    "ms": r["ms"],
+                    "Zeilen": r["rows"],
+                    "Δ Speicher (MB)": r["mem_delta_mb"],
+                }
+                for r in timings
+            ],
+            hide_index=True,
+        )
+        total_ms = sum(r["ms"] for r in timings if r["depth"] == 0)
+        st.caption(f"Gemessen: {total_ms:,.0f} ms".replace(",", "."))
+        st.download_button("Prometheus-Metriken", prometheus_text(), file_name="privatjet_metrics.prom")
+
+finish_run(timings, page="dashboard")
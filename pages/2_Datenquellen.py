@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
 
 from src.styles import apply_global_style
+from src.data import CSV_PATH, file_fingerprint, load_default_csv
+from src.preview import show_preview, show_column_summary
+from src.catalog import CATALOG_DIR, scan_catalog
 
 # Seiten-Config
 st.set_page_config(
@@ -29,10 +31,9 @@ st.divider()
 # =======================
 # CSV laden
 # =======================
-CSV_PATH = "data/drake_flights.csv"
-
 try:
-    df = pd.read_csv(CSV_PATH)
+    # Gleicher (gecachter) Datensatz wie im Dashboard – kein erneutes Parsen
+    df = load_default_csv(CSV_PATH)
 
     st.success("Standard-Datensatz erfolgreich geladen.")
 
@@ -43,12 +44,12 @@ try:
         "für die Berechnung von Kennzahlen, Karten und Diagrammen verwendet werden."
     )
 
-    # Tabelle anzeigen
-    st.dataframe(
-        df,
-        use_container_width=True,
-        height=600
-    )
+    # Tabelle seitenweise anzeigen – an den Browser geht nur die sichtbare Seite
+    cache_key = ("default", file_fingerprint(CSV_PATH))
+    show_preview(df, key="datenquellen", cache_key=cache_key)
+
+    with st.expander("Spaltenübersicht"):
+        show_column_summary(df, cache_key)
 
     st.markdown("### Beschreibung der Spalten")
 
@@ -62,6 +63,8 @@ try:
         - **co2_kg** – Geschätzte CO₂-Emissionen in Kilogramm  
         - **orig_lat / orig_lon** – Koordinaten des Startflughafens  
         - **dest_lat / dest_lon** – Koordinaten des Zielflughafens  
+        - **geo_status** – Abgleich mit der Flughafen-Referenz: *ok*, *ergänzt* (Label bzw.
+          Koordinaten aus der Referenz übernommen) oder *abweichend* (Label passt nicht zur Position)  
         """
     )
 
@@ -70,3 +73,22 @@ except FileNotFoundError:
         "Die CSV-Datei konnte nicht gefunden werden. "
         "Bitte stelle sicher, dass sich die Datei unter `data/drake_flights.csv` befindet."
     )
+
+# =======================
+# Flotten-Katalog
+# =======================
+catalog = scan_catalog(CATALOG_DIR)
+if not catalog.empty:
+    st.divider()
+    st.markdown("### Flotten-Katalog")
+    st.caption(
+        f"Weitere Flugzeuge liegen unter `{CATALOG_DIR}/tail=…/year=….csv|parquet`. "
+        "Im Dashboard werden nur die Dateien der gewählten Flugzeuge und Jahre geladen."
+    )
+    overview = (
+        catalog.groupby("tail")
+        .agg(Jahre=("year", lambda y: ", ".join(map(str, sorted(y)))), Dateien=("path", "size"))
+        .rename_axis("Kennzeichen")
+        .reset_index()
+    )
+    st.dataframe(overview, use_container_width=True, hide_index=True)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+# kg CO₂ pro kg verbranntem Kerosin (Jet A-1)
+CO2_PER_KG_FUEL = 3.16
+
+# Zuschlag pro Flug für Rollen, Steig- und Sinkflug (Minuten)
+TAXI_CLIMB_MIN = 25
+
+# Grobe Leistungsdaten pro Flugzeugtyp:
+# Reisegeschwindigkeit (km/h), Verbrauch (kg Kerosin/h), Reichweite (km)
+AIRCRAFT_TYPES = pd.DataFrame(
+    [
+        ("B767", "Boeing 767", 850, 4800, 11000),
+        ("GLF6", "Gulfstream G650", 900, 1500, 12900),
+        ("GL7T", "Bombardier Global 7500", 900, 1700, 14200),
+        ("CL35", "Bombardier Challenger 350", 830, 850, 5900),
+        ("C68A", "Cessna Citation Latitude", 800, 650, 5000),
+        ("E55P", "Embraer Phenom 300", 750, 450, 3600),
+    ],
+    columns=["type", "name", "cruise_kmh", "fuel_kg_h", "range_km"],
+).set_index("type")
+
+DEFAULT_AIRCRAFT_TYPE = "GLF6"
+
+
+def _type_values(aircraft_type, column: str, n: int) -> np.ndarray:
+    """
+    Leistungswert pro Zeile: aircraft_type ist ein einzelner Typ oder ein Array/Series von Typen
+    (unbekannte Typen fallen auf DEFAULT_AIRCRAFT_TYPE zurück).
+    Nachgeschlagen wird nur pro eindeutigem Typ, nicht pro Zeile.
+    """
+    table = AIRCRAFT_TYPES[column]
+    default = table[DEFAULT_AIRCRAFT_TYPE]
+    if aircraft_type is None or np.isscalar(aircraft_type):
+        return np.full(n, table.get(aircraft_type, default), dtype="float64")
+
+    types = pd.Categorical(aircraft_type)  # bei kategorialen Daten ohne erneutes Hashing
+    per_type = table.reindex(types.categories.astype(str)).fillna(default).to_numpy(dtype="float64")
+    return np.where(types.codes >= 0, per_type[types.codes], default)
+
+
+def flight_time_min(distance_km, aircraft_type=None) -> np.ndarray:
+    """
+    Blockzeit in Minuten aus Distanz und Reisegeschwindigkeit des Typs.
+    """
+    distance_km = np.asarray(distance_km, dtype="float64")
+    cruise = _type_values(aircraft_type, "cruise_kmh", len(distance_km))
+    return distance_km / cruise * 60 + TAXI_CLIMB_MIN
+
+
+def co2_kg(flight_time_min, aircraft_type=None) -> np.ndarray:
+    """
+    CO₂ in kg aus Flugdauer und Verbrauch des Typs (Kerosin × 3,16).
+    """
+    flight_time_min = np.asarray(flight_time_min, dtype="float64")
+    fuel_kg_h = _type_values(aircraft_type, "fuel_kg_h", len(flight_time_min))
+    return flight_time_min / 60 * fuel_kg_h * CO2_PER_KG_FUEL
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+
+
+def value_nbytes(value: Any) -> int:
+    """
+    Speicherbedarf eines Cache-Werts: DataFrames/Series (auch in Tupeln, Listen, dicts) mit
+    memory_usage(deep=True), alles andere zählt nicht.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(value_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(value_nbytes(v) for v in value.values())
+    return 0
+
+
+class LRUCache:
+    """
+    Kleiner, threadsicherer LRU-Cache (prozessweit, also über alle Seiten und Sessions geteilt).
+    Bei mehr als max_entries Einträgen – oder mehr als max_bytes Speicher (value_nbytes) –
+    fliegt der am längsten nicht benutzte raus, der neueste Eintrag bleibt immer;
+    on_evict(key, value) wird dann (auch bei clear) aufgerufen, z. B. um Dateien aufzuräumen.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 8,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries: OrderedDict = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        # Bauen (und Größe messen) außerhalb des Locks, damit andere Sessions nicht blockiert werden
+        value = builder()
+        size = value_nbytes(value) if self.max_bytes is not None else 0
+
+        evicted = []
+        with self._lock:
+            self._bytes += size - self._sizes.get(key, 0)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+            ):
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                evicted.append((old_key, old_value))
+        self._notify(evicted)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = list(self._entries.items())
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+        self._notify(evicted)
+
+    def _notify(self, evicted: list) -> None:
+        # Außerhalb des Locks: der Callback darf selbst auf Caches zugreifen
+        if self.on_evict is not None:
+            for key, value in evicted:
+                self.on_evict(key, value)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
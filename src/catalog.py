@@ -0,0 +1,147 @@
+"""
+Datensatz-Katalog über ein Verzeichnis von Flugdateien, partitioniert nach Kennzeichen und Jahr:
+
+    data/flights/tail=N767CJ/year=2023.parquet
+    data/flights/tail=N767CJ/year=2024.csv
+    data/flights/tail=N500GV/year=2024.parquet
+
+Geladen werden nur die Partitionen, die zur Auswahl (Flugzeuge, Jahre) passen.
+Einen bestehenden Datensatz partitionieren:
+    python -m src.catalog --source data/synthetic.parquet
+"""
+import argparse
+import os
+import re
+import sys
+
+import pandas as pd
+
+from src.cache import LRUCache
+from src.data import (
+    DATASET_CACHE,
+    concat_frames,
+    file_fingerprint,
+    load_flights_file,
+    load_flights_query,
+    query_fingerprint,
+    query_frame,
+    query_year_span,
+)
+
+CATALOG_DIR = "data/flights"
+PARTITION_PATTERN = re.compile(r"^year=(?P<year>\d{4})\.(?:csv|parquet)$")
+
+# Einzelne Partitionen – eigener Cache, damit große Auswahlen keine Datensätze/Cubes verdrängen
+PARTITION_CACHE = LRUCache(max_entries=64)
+
+
+def scan_catalog(root: str = CATALOG_DIR) -> pd.DataFrame:
+    """
+    Listet alle Partitionen (tail, year, path) – nur Verzeichniseinträge, keine Dateiinhalte.
+    """
+    rows = []
+    if os.path.isdir(root):
+        for tail_dir in os.scandir(root):
+            if not (tail_dir.is_dir() and tail_dir.name.startswith("tail=")):
+                continue
+            for entry in os.scandir(tail_dir.path):
+                match = PARTITION_PATTERN.match(entry.name)
+                if match and entry.is_file():
+                    rows.append((tail_dir.name[len("tail="):], int(match["year"]), entry.path))
+    catalog = pd.DataFrame(rows, columns=["tail", "year", "path"])
+    return catalog.sort_values(["tail", "year", "path"], ignore_index=True)
+
+
+def prune(catalog: pd.DataFrame, tails: list[str] | None = None, years: list[int] | None = None) -> pd.DataFrame:
+    """
+    Nur die Partitionen der gewählten Flugzeuge/Jahre (None = alle).
+    """
+    keep = pd.Series(True, index=catalog.index)
+    if tails is not None:
+        keep &= catalog["tail"].isin(tails)
+    if years is not None:
+        keep &= catalog["year"].isin(years)
+    return catalog[keep]
+
+
+def catalog_years(catalog: pd.DataFrame, tails: list[str] | None = None) -> list[int]:
+    return sorted(prune(catalog, tails=tails)["year"].unique().tolist())
+
+
+def partitions_fingerprint(partitions: pd.DataFrame) -> tuple:
+    return tuple(file_fingerprint(p) for p in partitions["path"])
+
+
+def _with_tail(df: pd.DataFrame, tail: str) -> pd.DataFrame:
+    if "tail" not in df.columns:
+        df["tail"] = pd.Categorical([tail] * len(df))
+    return df
+
+
+def _load_partition(path: str, tail: str, query: dict) -> pd.DataFrame:
+    # Jede Partition einzeln (ungefiltert) gecacht: beim Umschalten der Auswahl werden nur neue Dateien gelesen.
+    # Mit Abfrage und ohne Cache-Eintrag wird gefiltert gelesen – ohne eigenen Eintrag pro Filterwert.
+    key = ("partition", file_fingerprint(path))
+    if query and key not in PARTITION_CACHE:
+        return _with_tail(load_flights_query(path, query), tail)
+    return query_frame(PARTITION_CACHE.get_or_build(key, lambda: _with_tail(load_flights_file(path), tail)), query)
+
+
+def load_partitions(
+    catalog: pd.DataFrame,
+    tails: list[str] | None = None,
+    years: list[int] | None = None,
+    query: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Lädt nur die zur Auswahl passenden Partitionen und fügt sie zusammen.
+    Eine Abfrage (siehe src.data.make_query) überspringt zusätzlich Jahre außerhalb ihres
+    Zeitraums und wird innerhalb der übrigen Dateien an den Leser weitergegeben.
+    Einzelne Partitionen liegen in PARTITION_CACHE, das Ergebnis pro Auswahl in DATASET_CACHE.
+    """
+    query = query or {}
+    partitions = prune(catalog, tails=tails, years=years)
+    lo, hi = query_year_span(query)
+    if lo is not None:
+        partitions = partitions[partitions["year"] >= lo]
+    if hi is not None:
+        partitions = partitions[partitions["year"] <= hi]
+    if partitions.empty:
+        return pd.DataFrame()
+
+    def build():
+        return concat_frames([_load_partition(row.path, row.tail, query) for row in partitions.itertuples()])
+
+    # Zusammengefügter Frame pro Auswahl: ein unveränderter Rerun liest und verkettet nichts
+    key = ("partitions",) + partitions_fingerprint(partitions) + query_fingerprint(query)
+    return DATASET_CACHE.get_or_build(key, build)
+
+
+def write_partitioned(df: pd.DataFrame, root: str = CATALOG_DIR, default_tail: str = "UNBEKANNT") -> int:
+    """
+    Schreibt einen finalisierten Datensatz als Parquet-Partitionen tail=…/year=….parquet.
+    Rückgabe: Anzahl geschriebener Partitionen.
+    """
+    tails = df["tail"].astype("object").fillna(default_tail) if "tail" in df.columns else pd.Series(default_tail, index=df.index)
+    written = 0
+    for (tail, year), part in df.groupby([tails, df["year"]], observed=True, sort=True):
+        folder = os.path.join(root, f"tail={tail}")
+        os.makedirs(folder, exist_ok=True)
+        part.to_parquet(os.path.join(folder, f"year={int(year)}.parquet"), engine="pyarrow", index=False)
+        written += 1
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Flugdatensatz nach Kennzeichen und Jahr partitionieren")
+    parser.add_argument("--source", required=True, help="CSV oder Parquet mit Flügen")
+    parser.add_argument("--root", default=CATALOG_DIR, help="Zielverzeichnis des Katalogs")
+    args = parser.parse_args(argv)
+
+    written = write_partitioned(load_flights_file(args.source), root=args.root)
+    print(f"{written} Partitionen geschrieben: {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,56 @@
+import csv
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import tempfile
+import time
+from typing import Callable
+
 import pandas as pd
 import numpy as np
 
+from src.aircraft import co2_kg, flight_time_min
+from src.cache import LRUCache
+from src.instrument import timed
+from src.geo import AIRPORTS, airport_index, haversine_km, nearest_airport
+
+CSV_PATH = "data/drake_flights.csv"
+
+# Typisierte Spaltenkopien (Parquet) der CSV-Dateien liegen hier, relativ zur Quelldatei
+COLUMNAR_DIR = ".columnar"
+
+# Erhöhen, sobald sich die Ausgabe von finalize_df/compact_dtypes ändert: alte Kopien werden dann ignoriert
+COLUMNAR_VERSION = 2
+COLUMNAR_SOURCE_KEY = b"privatjet.source"
+
+# Uploads ab dieser Größe werden blockweise eingelesen und als Parquet zwischengespeichert
+STREAM_THRESHOLD_BYTES = 50 * 1024 * 1024
+STREAM_CHUNK_ROWS = 250_000
+STREAM_DIR = os.path.join(tempfile.gettempdir(), "privatjet-tracker")
+SNIFF_BYTES = 64 * 1024
+
+# Parquet-Zwischenspeicher großer Uploads pro Cache-Schlüssel; fliegt der Eintrag raus, wird die Datei gelöscht
+STREAM_FILES: dict[tuple, str] = {}
+
+# Verwaiste Zwischenspeicher (z. B. von beendeten Prozessen) werden nach dieser Zeit entfernt
+STREAM_MAX_AGE_S = 24 * 3600
+
+def _drop_stream_file(key, value) -> None:
+    path = STREAM_FILES.pop(key, None)
+    if path is not None and os.path.exists(path):
+        os.remove(path)  # geöffnete Memory-Maps bleiben unter Linux gültig
+
+# Geparste Datensätze, prozessweit geteilt (Dashboard + Datenquellen, alle Sessions).
+# Begrenzt nach Speicher (ein großer Upload belegt Rohdaten + fertige Frames); die Anzahl
+# begrenzt nur viele kleine Einträge (Filter-Ansichten, Cubes, Reisen), ohne Datensätze zu verdrängen
+DATASET_CACHE_MAX_BYTES = 1024 * 1024**2
+DATASET_CACHE = LRUCache(max_entries=32, on_evict=_drop_stream_file, max_bytes=DATASET_CACHE_MAX_BYTES)
+
+# Inhalts-Hashes und Vorschauen von Uploads (pro Streamlit-file_id) – ein Rerun hasht nichts neu
+UPLOAD_CACHE = LRUCache(max_entries=32)
+
 REQUIRED_COLUMNS = [
     "date",
     "origin", "destination",
@@ -11,59 +61,218 @@ REQUIRED_COLUMNS = [
     "dest_lat", "dest_lon",
 ]
 
-def load_flights_placeholder(seed: int = 42) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    n = 800
-
-    df = pd.DataFrame({
-        "date": pd.to_datetime(
-            rng.choice(pd.date_range("2019-01-01", "2025-12-31", freq="D"), size=n)
-        ),
-        "origin": rng.choice(["FRA", "MUC", "BER", "HAM", "CGN"], size=n),
-        "destination": rng.choice(["LHR", "CDG", "ZRH", "AMS", "BCN", "FCO"], size=n),
-        "distance_km": rng.normal(900, 350, size=n).clip(80, 3500).round(0),
-        "flight_time_min": rng.normal(120, 50, size=n).clip(25, 420).round(0),
-        "co2_kg": rng.normal(2500, 1200, size=n).clip(200, 12000).round(0),
-        "orig_lat": rng.normal(50.0, 2.0, size=n),
-        "orig_lon": rng.normal(10.0, 3.0, size=n),
-        "dest_lat": rng.normal(48.0, 3.0, size=n),
-        "dest_lon": rng.normal(8.0, 4.0, size=n),
-    })
+NUMERIC_COLUMNS = ["distance_km", "flight_time_min", "co2_kg"]
+COORD_COLUMNS = ["orig_lat", "orig_lon", "dest_lat", "dest_lon"]
+
+# Nachkommastellen für ausgegebene Koordinaten (Karte)
+COORD_DECIMALS = 5
+
+# Diese Spalten dürfen fehlen: derive_flight_metrics berechnet sie aus den Koordinaten
+DERIVABLE_COLUMNS = NUMERIC_COLUMNS
+
+# IATA/ICAO-Code am Ende eines Labels, z. B. "Toronto (YYZ)"
+AIRPORT_CODE_PATTERN = r"\(([A-Z0-9]{3,4})\)\s*$"
+UNKNOWN_AIRPORT = "Unbekannt"
 
+# Flughafen-Label und Koordinaten ersetzen sich gegenseitig (resolve_airports ergänzt die fehlende Seite)
+AIRPORT_ENDS = [("origin", "orig_lat", "orig_lon"), ("destination", "dest_lat", "dest_lon")]
+RESOLVABLE_FROM = {
+    label: [lat, lon] for label, lat, lon in AIRPORT_ENDS
+} | {
+    coord: [label] for label, lat, lon in AIRPORT_ENDS for coord in (lat, lon)
+}
+
+def load_flights_placeholder(seed: int = 42, n: int = 800) -> pd.DataFrame:
+    """
+    Synthetische Demo-Flüge (src.synth); n steuert die Größe, z. B. für Benchmarks.
+    """
+    from src.synth import generate_flights  # nur für Demo-Daten gebraucht
+
+    df = generate_flights(n, seed=seed)
     df = enrich_time_cols(df)
     return df
 
+# Datum mit Punkten ("04.03.2024") ist immer Tag.Monat.Jahr – pandas würde es sonst Monat zuerst lesen
+DOTTED_DATE_PATTERN = re.compile(r"^\s*\d{1,2}\.\d{1,2}\.\d{2,4}\b")
+
+def _is_dotted_date(values: pd.Series) -> bool:
+    first = values.dropna().head(1)
+    return len(first) > 0 and bool(DOTTED_DATE_PATTERN.match(str(first.iloc[0])))
+
+def _coerce_column(df: pd.DataFrame, col: str) -> None:
+    """
+    Wandelt eine Spalte in-place in Zahl bzw. Datum um (no-op, wenn der Typ schon passt).
+    """
+    if col == "date":
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=_is_dotted_date(df[col]))
+    elif not pd.api.types.is_numeric_dtype(df[col]):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+def _keep_rows(df: pd.DataFrame, valid: pd.Series) -> pd.DataFrame:
+    """
+    Zeilenfilter mit genau einer Kopie – und gar keiner, wenn alle Zeilen gültig sind.
+    """
+    if valid.all():
+        return df
+    return df.take(np.flatnonzero(valid.to_numpy()))
+
+def _add_time_cols(df: pd.DataFrame) -> None:
+    """
+    date_str/year/month in-place. Die Labels werden nur pro eindeutigem Tag bzw. Monat
+    formatiert und als Kategorie abgelegt, nicht als Python-String pro Zeile.
+    """
+    days = df["date"].to_numpy().astype("datetime64[D]")
+    unique_days, day_codes = np.unique(days, return_inverse=True)
+    df["date_str"] = pd.Categorical.from_codes(
+        day_codes.ravel(), categories=np.datetime_as_string(unique_days, unit="D"), ordered=True
+    )
+
+    year = df["date"].dt.year.to_numpy()
+    month_id = year * 12 + df["date"].dt.month.to_numpy() - 1
+    unique_months, month_codes = np.unique(month_id, return_inverse=True)
+    df["year"] = year.astype("int16")
+    df["month"] = pd.Categorical.from_codes(
+        month_codes.ravel(),
+        categories=[f"{m // 12:04d}-{m % 12 + 1:02d}" for m in unique_months],
+        ordered=True,
+    )
+
 def enrich_time_cols(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["date_str"] = df["date"].dt.strftime("%Y-%m-%d")  # ✅ neu
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.to_period("M").astype(str)
+    df = df.copy(deep=False)
+    _coerce_column(df, "date")
+    df = _keep_rows(df, df["date"].notna())
+    _add_time_cols(df)
     return df
 
-def read_csv_any(uploaded_file) -> pd.DataFrame:
+# Zahlenformate im Sniff-Ausschnitt: deutsch "1.980,5" / "12,5" vs. englisch "1,980.5" / "12.5"
+COMMA_DECIMAL_PATTERN = re.compile(r"^[-+]?(\d{1,3}(\.\d{3})+|\d+),\d+$")
+DOT_DECIMAL_PATTERN = re.compile(r"^[-+]?(\d{1,3}(,\d{3})+|\d+)\.\d+$")
+DOT_THOUSANDS_PATTERN = re.compile(r"^[-+]?\d{1,3}(\.\d{3})+(,\d+)?$")
+COMMA_THOUSANDS_PATTERN = re.compile(r"^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$")
+CSV_DELIMITERS = ",;\t|"
+
+def _csv_kwargs(dialect: dict) -> dict:
+    # Tausendertrennzeichen nicht an read_csv: das würde auch Datumswerte wie "02.01.2024" zu Zahlen machen
+    return {k: dialect[k] for k in ("sep", "encoding", "decimal")}
+
+def parse_grouped_numbers(df: pd.DataFrame, dialect: dict) -> pd.DataFrame:
     """
-    Liest CSV robust ein (Delimiter/Encoding wird grob abgefedert).
+    Wandelt Textspalten mit Tausendertrennzeichen (z. B. "1.980,5") in Zahlen um –
+    nur Spalten, deren Werte durchweg so aussehen.
     """
-    # Versuch 1: Standard
-    try:
-        return pd.read_csv(uploaded_file)
-    except Exception:
-        pass
+    thousands, decimal = dialect.get("thousands"), dialect.get("decimal", ".")
+    if thousands is None:
+        return df
+    grouped = DOT_THOUSANDS_PATTERN if thousands == "." else COMMA_THOUSANDS_PATTERN
+    plain = re.compile(r"^[-+]?\d+(" + re.escape(decimal) + r"\d+)?$")
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        values = df[col].dropna().astype(str).str.strip()
+        is_grouped = values.str.match(grouped)
+        if is_grouped.any() and (is_grouped | values.str.match(plain)).all():
+            text = df[col].astype(str).str.strip().str.replace(thousands, "", regex=False)
+            df[col] = pd.to_numeric(text.str.replace(decimal, ".", regex=False), errors="coerce")
+    return df
 
-    # Versuch 2: Semikolon (deutsche CSV)
-    uploaded_file.seek(0)
+@timed()
+def read_csv_any(uploaded_file) -> pd.DataFrame:
+    """
+    Liest CSV (Pfad oder Datei-Objekt) genau einmal ein: Trennzeichen, Encoding und
+    Zahlenformat werden vorab aus einem kurzen Ausschnitt erkannt (sniff_csv).
+    Mit pyarrow wird dessen schnellerer Parser verwendet.
+    """
+    dialect = sniff_csv(uploaded_file)
     try:
-        return pd.read_csv(uploaded_file, sep=";")
+        df = pd.read_csv(uploaded_file, engine="pyarrow" if has_pyarrow() else "c", **_csv_kwargs(dialect))
     except Exception as e:
         raise ValueError(f"CSV konnte nicht gelesen werden: {e}")
 
+    # Eine einzige Spalte, deren Name selbst Trennzeichen enthält: falsch erkannt, nicht stillschweigend annehmen
+    if len(df.columns) == 1 and re.search(r"[,;\t|:]", str(df.columns[0])):
+        raise ValueError(
+            f"Trennzeichen nicht erkannt (gelesen mit {dialect['sep']!r}, nur eine Spalte). "
+            "Bitte Komma, Semikolon oder Tab als Trennzeichen verwenden."
+        )
+    return parse_grouped_numbers(df, dialect)
+
+def _read_prefix(file, nbytes: int) -> bytes:
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read(nbytes)
+    file.seek(0)
+    prefix = file.read(nbytes)
+    file.seek(0)
+    return prefix.encode("utf-8") if isinstance(prefix, str) else prefix
+
+def _guess_delimiter(lines: list[str]) -> str:
+    """
+    Fallback, wenn csv.Sniffer scheitert: das Zeichen, das in allen Zeilen gleich oft
+    (und am häufigsten) vorkommt.
+    """
+    best, best_count = ",", 0
+    for d in CSV_DELIMITERS:
+        counts = {line.count(d) for line in lines if line.strip()}
+        if len(counts) == 1 and (count := counts.pop()) > best_count:
+            best, best_count = d, count
+    return best
+
+def _number_format(fields: list[str], sep: str = ",") -> tuple[str, str | None]:
+    """
+    Dezimal- und Tausendertrennzeichen aus den Feldwerten (Mehrheit der eindeutigen Fälle).
+    "1.980" allein ist mehrdeutig und zählt nicht. Gibt es gar keinen eindeutigen Fall, entscheiden
+    Semikolon als Trennzeichen plus Datum mit Punkten ("04.03.2024") für das deutsche Format.
+    """
+    comma = sum(1 for f in fields if COMMA_DECIMAL_PATTERN.match(f))
+    dot = sum(1 for f in fields if DOT_DECIMAL_PATTERN.match(f) and not DOT_THOUSANDS_PATTERN.match(f))
+    german = comma > dot or (
+        comma == dot == 0 and sep == ";" and any(DOTTED_DATE_PATTERN.match(f) for f in fields)
+    )
+    if german:
+        thousands = "." if any(DOT_THOUSANDS_PATTERN.match(f) for f in fields) else None
+        return ",", thousands
+    thousands = "," if any(COMMA_THOUSANDS_PATTERN.match(f) for f in fields) else None
+    return ".", thousands
+
+def sniff_csv(file, nbytes: int = SNIFF_BYTES) -> dict:
+    """
+    Erkennt Trennzeichen, Encoding sowie Dezimal- und Tausendertrennzeichen aus den
+    ersten Kilobytes (Pfad oder Datei-Objekt).
+    Rückgabe z. B. {"sep": ";", "encoding": "cp1252", "decimal": ",", "thousands": "."}
+    (thousands nicht an read_csv übergeben, sondern parse_grouped_numbers verwenden)
+    """
+    prefix = _read_prefix(file, nbytes)
+
+    # Nur vollständige Zeilen betrachten (keine abgeschnittenen Multibyte-Zeichen am Ende)
+    if len(prefix) == nbytes and b"\n" in prefix:
+        prefix = prefix[: prefix.rfind(b"\n")]
+
+    if prefix.startswith(b"\xef\xbb\xbf"):
+        encoding = "utf-8-sig"
+    else:
+        try:
+            prefix.decode("utf-8")
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = "cp1252"  # typischer Excel-Export unter Windows
+    text = prefix.decode(encoding, errors="replace")
+    lines = text.splitlines()
+
+    try:
+        sep = csv.Sniffer().sniff(text, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        sep = _guess_delimiter(lines[:50])
+
+    fields = [f.strip() for row in csv.reader(lines[1:200], delimiter=sep) for f in row]
+    decimal, thousands = _number_format(fields, sep)
+    return {"sep": sep, "encoding": encoding, "decimal": decimal, "thousands": thousands}
+
 def normalize_column_names(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normalisiert Spaltennamen (klein, trim, spaces->underscore)
     """
-    df = df.copy()
+    df = df.copy(deep=False)  # nur die Spaltennamen ändern sich, die Daten nicht
     df.columns = (
         df.columns.astype(str)
         .str.strip()
@@ -80,6 +289,8 @@ def auto_map_columns(df: pd.DataFrame) -> dict:
     """
     candidates = {
         "date": ["date", "datetime", "timestamp", "flight_date", "time"],
+        "aircraft_type": ["aircraft_type", "ac_type", "type", "icao_type", "typecode"],
+        "tail": ["tail", "tail_number", "registration", "reg", "aircraft"],
         "origin": ["origin", "from", "dep", "departure", "departure_airport", "orig"],
         "destination": ["destination", "to", "arr", "arrival", "arrival_airport", "dest"],
         "distance_km": ["distance_km", "distance", "km", "great_circle_km"],
@@ -100,64 +311,933 @@ def auto_map_columns(df: pd.DataFrame) -> dict:
                 break
     return mapping
 
+@timed()
 def apply_mapping(df: pd.DataFrame, mapping: dict) -> pd.DataFrame:
     """
     Benennt Spalten gemäß mapping um.
     mapping: {zielspalte: aktuelle_spalte}
     """
     rename_dict = {v: k for k, v in mapping.items()}
-    out = df.rename(columns=rename_dict).copy()
+    out = df.copy(deep=False)
+    out.columns = [rename_dict.get(c, c) for c in out.columns]
     return out
 
-def validate_flights_df(df: pd.DataFrame) -> tuple[bool, list[str]]:
-    errors = []
-    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
-    if missing:
-        errors.append(f"Fehlende Spalten: {', '.join(missing)}")
-
-    if "date" in df.columns:
-        tmp = pd.to_datetime(df["date"], errors="coerce")
-        if tmp.isna().mean() > 0.2:
-            errors.append("Viele ungültige Datumswerte in 'date' (mehr als 20%).")
-
-    # Plausibilitäten (nur leicht, um Nutzer nicht zu nerven)
-    for col, low, high in [
-        ("distance_km", 1, 20000),
-        ("flight_time_min", 1, 2000),
-        ("co2_kg", 0, 500000),
-    ]:
-        if col in df.columns:
-            numeric = pd.to_numeric(df[col], errors="coerce")
-            if numeric.isna().mean() > 0.3:
-                errors.append(f"Viele ungültige Werte in '{col}' (mehr als 30%).")
+# Plausibilitäten (nur leicht, um Nutzer nicht zu nerven): (spalte, min, max)
+PLAUSIBILITY_RULES = [
+    ("distance_km", 1, 20000),
+    ("flight_time_min", 1, 2000),
+    ("co2_kg", 0, 500000),
+]
+
+# Schnellprüfung beim Umstellen des Mappings: so viele Zeilen, verteilt über die ganze Datei
+VALIDATION_SAMPLE_ROWS = 20_000
+
+def stratified_sample(df: pd.DataFrame, n: int, strata: int = 20, seed: int = 0) -> pd.DataFrame:
+    """
+    Zufallsstichprobe aus gleich großen Blöcken der Datei (Anfang, Mitte, Ende sind
+    gleichermaßen vertreten – wichtig, weil Exporte oft zeitlich sortiert sind).
+    """
+    if len(df) <= n:
+        return df
+    rng = np.random.default_rng(seed)
+    bounds = np.linspace(0, len(df), strata + 1).astype(int)
+    per_stratum = max(n // strata, 1)
+    positions = np.concatenate([
+        rng.choice(np.arange(lo, hi), size=min(per_stratum, hi - lo), replace=False)
+        for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+    ])
+    return df.take(np.sort(positions))
+
+def _share_interval(count: int, n: int, exact: bool, z: float = 1.96) -> tuple[float, float]:
+    """
+    Anteil count/n als (untere, obere) Grenze: exakt bei Vollprüfung,
+    sonst 95%-Wilson-Intervall der Stichprobe.
+    """
+    if n == 0:
+        return 0.0, 0.0
+    p = count / n
+    if exact:
+        return p, p
+    denom = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denom
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+def _check_share(report: dict, count: int, n: int, limit: float, message: str) -> None:
+    low, high = _share_interval(count, n, exact=not report["sampled"])
+    if low > limit:
+        report["errors"].append(message)
+    elif high > limit:
+        report["uncertain"].append(message)
+
+@timed()
+def coerce_flights_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Wandelt alle vorhandenen Zielspalten in Zahl/Datum um (ohne die Daten zu kopieren).
+    Danach muss weder validate_flights_df noch finalize_df erneut konvertieren.
+    """
+    df = df.copy(deep=False)
+    for c in ["date"] + NUMERIC_COLUMNS + COORD_COLUMNS:
+        if c in df.columns:
+            _coerce_column(df, c)
+    return df
+
+@timed()
+def validation_report(
+    df: pd.DataFrame, sample_size: int | None = None, seed: int = 0, head_only: bool = False
+) -> dict:
+    """
+    Strukturierter Prüfbericht:
+    {"ok", "rows", "checked", "sampled", "head_only", "missing",
+     "columns": {spalte: {"invalid", "below", "above"}}, "errors": [...], "uncertain": [...]}
+    Mit sample_size wird nur eine geschichtete Stichprobe geprüft; "errors" enthält dann
+    nur Befunde, die trotz Stichprobenfehler sicher sind, unsichere landen in "uncertain".
+    head_only: df sind nur die ersten Zeilen einer größeren Datei – wird wie eine Stichprobe bewertet.
+    """
+    report = {
+        "ok": False, "rows": len(df), "checked": 0, "sampled": head_only, "head_only": head_only,
+        "missing": [
+            c for c in REQUIRED_COLUMNS
+            if c not in df.columns and c not in DERIVABLE_COLUMNS
+            and not all(alt in df.columns for alt in RESOLVABLE_FROM.get(c, [None]))
+        ],
+        "columns": {}, "errors": [], "uncertain": [],
+    }
+    if report["missing"]:
+        # Früher Abbruch: ohne Pflichtspalten lohnt keine Konvertierung
+        report["errors"].append(f"Fehlende Spalten: {', '.join(report['missing'])}")
+        return report
+
+    if sample_size is not None and len(df) > sample_size:
+        df = stratified_sample(df, sample_size, seed=seed)
+        report["sampled"] = True
+    n = report["checked"] = len(df)
+    rules = [rule for rule in PLAUSIBILITY_RULES if rule[0] in df.columns]  # fehlende werden abgeleitet
+    df = coerce_flights_df(df[["date"] + [col for col, _, _ in rules]])
+
+    invalid_dates = int(df["date"].isna().sum())
+    report["columns"]["date"] = {"invalid": invalid_dates, "below": 0, "above": 0}
+    _check_share(report, invalid_dates, n, 0.2, "Viele ungültige Datumswerte in 'date' (mehr als 20%).")
+
+    for col, low, high in rules:
+        values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+        stats = {
+            "invalid": int(np.isnan(values).sum()),
+            "below": int((values < low).sum()),
+            "above": int((values > high).sum()),
+        }
+        report["columns"][col] = stats
+
+        known_errors = len(report["errors"])
+        _check_share(report, stats["invalid"], n, 0.3, f"Viele ungültige Werte in '{col}' (mehr als 30%).")
+        if len(report["errors"]) > known_errors:
+            continue  # Spalte ist ohnehin unbrauchbar, Plausibilität erst nach Korrektur
+        _check_share(report, stats["below"], n, 0.1, f"Unplausible Werte: '{col}' häufig < {low}.")
+        _check_share(report, stats["above"], n, 0.05, f"Unplausible Werte: '{col}' teils > {high}.")
+
+    report["ok"] = not report["errors"]
+    return report
+
+def validation_table(report: dict) -> pd.DataFrame:
+    """
+    Prüfbericht als Tabelle (eine Zeile pro Spalte) für die Anzeige.
+    """
+    table = pd.DataFrame.from_dict(report["columns"], orient="index")
+    table.index.name = "spalte"
+    return table.reset_index()
+
+def validate_flights_df(df: pd.DataFrame, sample_size: int | None = None) -> tuple[bool, list[str]]:
+    report = validation_report(df, sample_size=sample_size)
+    return report["ok"], report["errors"]
+
+def derive_flight_metrics(df: pd.DataFrame, aircraft_type: str | None = None, overwrite: bool = False) -> pd.DataFrame:
+    """
+    Ergänzt distance_km, flight_time_min und co2_kg aus den Koordinaten (vektorisiert):
+    Großkreisdistanz, Blockzeit aus Reisegeschwindigkeit, CO₂ aus Verbrauch des Flugzeugtyps.
+    Typ pro Zeile aus der Spalte aircraft_type, sonst der übergebene (oder Standard-)Typ.
+    Die Distanz wird nur einmal pro eindeutigem Koordinatenpaar berechnet.
+    Ohne overwrite werden nur fehlende Spalten bzw. leere Werte gefüllt.
+    """
+    df = df.copy(deep=False)
+    for c in COORD_COLUMNS:
+        _coerce_column(df, c)
+
+    # Eindeutige Start/Ziel-Paare: Distanz einmal pro Paar, dann per Code auf alle Zeilen verteilen
+    pair_codes = df.groupby(COORD_COLUMNS, sort=False, dropna=False).ngroup().to_numpy()
+    _, first_rows = np.unique(pair_codes, return_index=True)
+    pairs = df[COORD_COLUMNS].take(first_rows).to_numpy(dtype="float64")
+    distance = haversine_km(pairs[:, 0], pairs[:, 1], pairs[:, 2], pairs[:, 3])[pair_codes].round(0)
+
+    types = df["aircraft_type"] if "aircraft_type" in df.columns else aircraft_type
+    minutes = flight_time_min(distance, types).round(0)
+    derived = {
+        "distance_km": distance,
+        "flight_time_min": minutes,
+        "co2_kg": co2_kg(minutes, types).round(0),
+    }
+
+    for col, values in derived.items():
+        if overwrite or col not in df.columns:
+            df[col] = values
+        else:
+            _coerce_column(df, col)
+            if df[col].isna().any():
+                df[col] = df[col].fillna(pd.Series(values, index=df.index))
+    return df
+
+# Position gilt als "an diesem Flughafen", wenn sie höchstens so weit entfernt ist (km)
+SNAP_MAX_KM = 25.0
+
+# geo_status: Koordinaten/Labels wie geliefert, aus der Referenz ergänzt, oder Label passt nicht zur Position
+GEO_STATUS = ["ok", "ergänzt", "abweichend"]
+
+def _label_airports(labels: pd.Series, airports: pd.DataFrame) -> np.ndarray:
+    """
+    Zeile in der Flughafentabelle pro Label ("Toronto (YYZ)" oder nur "YYZ"), sonst -1 (auch ohne Label).
+    Der Code wird nur einmal pro eindeutigem Label gesucht.
+    """
+    codes, uniques = pd.factorize(labels)
+    if not len(uniques):
+        return np.full(len(labels), -1, dtype="int64")
+    texts = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+    found = texts.str.extract(AIRPORT_CODE_PATTERN, expand=False)
+    found = found.fillna(texts.where(texts.str.fullmatch(r"[A-Z0-9]{3,4}")))
+    positions = pd.Series(np.arange(len(airports)), index=airports["code"].to_numpy())
+    positions = positions[~positions.index.duplicated()]
+    per_label = positions.reindex(found.to_numpy()).fillna(-1).to_numpy(dtype="int64")
+    return np.where(codes >= 0, per_label[np.maximum(codes, 0)], -1)
+
+def _position_labels(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    # Label für Positionen ohne Flughafen in der Nähe, auf 0,1° gerundet (ca. 10 km), einmal pro Raster-Zelle
+    cells = np.round(lat * 10).astype("int64") * 4000 + np.round(lon * 10).astype("int64")
+    _, first_rows, inverse = np.unique(cells, return_index=True, return_inverse=True)
+    texts = np.array([f"{UNKNOWN_AIRPORT} ({lat[i]:.1f}, {lon[i]:.1f})" for i in first_rows], dtype=object)
+    return texts[inverse]
+
+@timed()
+def resolve_airports(
+    df: pd.DataFrame, airports: pd.DataFrame | None = None, max_km: float = SNAP_MAX_KM
+) -> pd.DataFrame:
+    """
+    Gleicht Flughafen-Labels und Koordinaten mit der Referenztabelle ab (vektorisiert):
+    - fehlende Koordinaten kommen aus dem Flughafen-Code im Label,
+    - fehlende Labels aus dem nächsten Flughafen (räumlicher Index, eine Abfrage für alle Zeilen),
+    - liegt die Position mehr als max_km vom Flughafen des Labels entfernt, wird die Zeile
+      in geo_status als "abweichend" markiert statt entfernt.
+    Zeilen, die danach noch keine Koordinaten haben, entfernt finalize_df.
+    """
+    df = df.copy(deep=False)
+    reference = AIRPORTS if airports is None else airports
+    ref_lat = reference["lat"].to_numpy(dtype="float64")
+    ref_lon = reference["lon"].to_numpy(dtype="float64")
+    ref_labels = reference["label"].to_numpy(dtype=object)
+    n = len(df)
+    status = np.zeros(n, dtype="int8")
+
+    for label_col, lat_col, lon_col in AIRPORT_ENDS:
+        lat = df[lat_col].to_numpy(dtype="float64", na_value=np.nan) if lat_col in df.columns else np.full(n, np.nan)
+        lon = df[lon_col].to_numpy(dtype="float64", na_value=np.nan) if lon_col in df.columns else np.full(n, np.nan)
+        labels = df[label_col] if label_col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        ref = _label_airports(labels, reference)
+        has_position = ~(np.isnan(lat) | np.isnan(lon))
+        known = ref >= 0
+
+        # Koordinaten aus dem Label ergänzen
+        fill = known & ~has_position
+        if fill.any():
+            lat, lon = lat.copy(), lon.copy()
+            lat[fill], lon[fill] = ref_lat[ref[fill]], ref_lon[ref[fill]]
+            status[fill] = np.maximum(status[fill], 1)
+
+        # Label und Position müssen zusammenpassen
+        check = np.flatnonzero(known & has_position)
+        if len(check):
+            dist = haversine_km(lat[check], lon[check], ref_lat[ref[check]], ref_lon[ref[check]])
+            status[check[dist > max_km]] = 2
+
+        # Labels aus der Position ergänzen: nächster Flughafen, sonst gerundete Position
+        missing = np.flatnonzero(labels.isna().to_numpy() & has_position)
+        if len(missing):
+            nearest, dist = nearest_airport(airport_index(airports), lat[missing], lon[missing])
+            snapped = dist <= max_km
+            new_labels = ref_labels[np.maximum(nearest, 0)]
+            if not snapped.all():
+                far = missing[~snapped]
+                new_labels[~snapped] = _position_labels(lat[far], lon[far])
+            if isinstance(labels.dtype, pd.CategoricalDtype):
+                labels = labels.cat.add_categories(pd.Index(new_labels).unique().difference(labels.cat.categories))
             else:
-                if (numeric < low).mean() > 0.1:
-                    errors.append(f"Unplausible Werte: '{col}' häufig < {low}.")
-                if (numeric > high).mean() > 0.05:
-                    errors.append(f"Unplausible Werte: '{col}' teils > {high}.")
+                labels = labels.astype(object)
+            labels = labels.copy()
+            labels.iloc[missing] = new_labels
+            status[missing] = np.maximum(status[missing], 1)
 
-    ok = len(errors) == 0
-    return ok, errors
+        df[lat_col], df[lon_col], df[label_col] = lat, lon, labels
 
-def finalize_df(df: pd.DataFrame) -> pd.DataFrame:
+    df["geo_status"] = pd.Categorical.from_codes(status, categories=GEO_STATUS)
+    return df
+
+@timed()
+def finalize_df(df: pd.DataFrame, airports: pd.DataFrame | None = None) -> pd.DataFrame:
     """
-    Typen setzen, Zeitspalten erzeugen.
+    Typen setzen, Zeitspalten erzeugen – in einem Durchgang:
+    Spalten werden ersetzt statt kopiert, ungültige Zeilen (Datum/Koordinaten) einmal entfernt.
+    Fehlende Labels/Koordinaten werden über die Flughafen-Referenz ergänzt (resolve_airports),
+    fehlende Distanz/Dauer/CO₂-Werte aus den Koordinaten abgeleitet.
+    airports: eigene Referenztabelle (Spalten code, label, lat, lon), z. B. aus
+    load_airport_reference; ohne nur die eingebauten Flughäfen aus src.geo.AIRPORTS.
     """
-    df = df.copy()
-    df["distance_km"] = pd.to_numeric(df["distance_km"], errors="coerce")
-    df["flight_time_min"] = pd.to_numeric(df["flight_time_min"], errors="coerce")
-    df["co2_kg"] = pd.to_numeric(df["co2_kg"], errors="coerce")
+    df = df.copy(deep=False)
+    for c in ["date"] + [c for c in COORD_COLUMNS + NUMERIC_COLUMNS if c in df.columns]:
+        _coerce_column(df, c)
+    df = resolve_airports(df, airports)
 
-    for c in ["orig_lat", "orig_lon", "dest_lat", "dest_lon"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+    valid = df["date"].notna() & df[COORD_COLUMNS].notna().all(axis=1)
+    df = _keep_rows(df, valid)
+    if any(c not in df.columns or df[c].isna().any() for c in DERIVABLE_COLUMNS):
+        df = derive_flight_metrics(df)
+    _add_time_cols(df)
+    return df
 
-    df = enrich_time_cols(df)
-    df = df.dropna(subset=["orig_lat", "orig_lon", "dest_lat", "dest_lon"])
+# Ein Flug gilt als Duplikat, wenn diese Spalten (soweit vorhanden) übereinstimmen
+DEDUP_KEY = ["date", "origin", "destination", "tail"]
+
+def _first_per_code(codes: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    out = np.full(size, np.nan, dtype="float64")
+    unique_codes, first_rows = np.unique(codes, return_index=True)
+    out[unique_codes] = values[first_rows]
+    return out
+
+@timed()
+def build_airport_dim(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Zerlegt den Flug-Frame in eine Flughafen-Dimension und einen kompakten Flug-Frame.
+    airports: eine Zeile pro Flughafen (airport_id, label, code, lat, lon).
+    flights: origin/destination als Kategorien mit denselben Kategorien wie airports.label –
+    der Kategorie-Code ist also die airport_id. Die vier Koordinatenspalten entfallen und
+    werden bei Bedarf mit join_coords ergänzt.
+    """
+    # Labels einmal hashen (bzw. vorhandene Kategorien übernehmen), dann nur noch Codes umrechnen
+    origin = df["origin"].astype("category")
+    destination = df["destination"].astype("category")
+    labels = origin.cat.categories.union(destination.cat.categories).astype(str)
+    if origin.isna().any() or destination.isna().any():
+        labels = labels.append(pd.Index([UNKNOWN_AIRPORT])).unique()
+
+    orig_codes = origin.cat.set_categories(labels).cat.codes.to_numpy()
+    dest_codes = destination.cat.set_categories(labels).cat.codes.to_numpy()
+    if UNKNOWN_AIRPORT in labels:
+        orig_codes = np.where(orig_codes < 0, labels.get_loc(UNKNOWN_AIRPORT), orig_codes)
+        dest_codes = np.where(dest_codes < 0, labels.get_loc(UNKNOWN_AIRPORT), dest_codes)
+
+    # Koordinaten je Flughafen: erstes Vorkommen als Start, ersatzweise als Ziel
+    lat = _first_per_code(orig_codes, df["orig_lat"].to_numpy(dtype="float64"), len(labels))
+    lon = _first_per_code(orig_codes, df["orig_lon"].to_numpy(dtype="float64"), len(labels))
+    dest_lat = _first_per_code(dest_codes, df["dest_lat"].to_numpy(dtype="float64"), len(labels))
+    dest_lon = _first_per_code(dest_codes, df["dest_lon"].to_numpy(dtype="float64"), len(labels))
+
+    label_series = pd.Series(labels, dtype="object")
+    airports = pd.DataFrame({
+        "airport_id": np.arange(len(labels), dtype="int32"),
+        "label": labels,
+        "code": label_series.str.extract(AIRPORT_CODE_PATTERN, expand=False).fillna(label_series).to_numpy(),
+        "lat": np.where(np.isnan(lat), dest_lat, lat),
+        "lon": np.where(np.isnan(lon), dest_lon, lon),
+    })
+
+    flights = df.drop(columns=COORD_COLUMNS)
+    flights["origin"] = pd.Categorical.from_codes(orig_codes, categories=labels)
+    flights["destination"] = pd.Categorical.from_codes(dest_codes, categories=labels)
+    return compact_dtypes(flights), airports
+
+def join_coords(df: pd.DataFrame, airports: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ergänzt orig_lat/orig_lon/dest_lat/dest_lon aus der Flughafen-Dimension
+    (nur für die übergebenen Zeilen – z. B. die aggregierten Routen der Karte).
+    """
+    out = df.copy(deep=False)
+    # float64, auf 5 Stellen (~1 m) gerundet: float32-Werte würden als 46.23699951171875 serialisiert
+    lat = airports["lat"].to_numpy(dtype="float64").round(COORD_DECIMALS)
+    lon = airports["lon"].to_numpy(dtype="float64").round(COORD_DECIMALS)
+    labels = pd.Index(airports["label"])
+    for prefix, col in [("orig", "origin"), ("dest", "destination")]:
+        values = out[col]
+        if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.equals(labels):
+            idx = values.cat.codes.to_numpy()
+        else:
+            idx = labels.get_indexer(values.astype("object"))
+        found = idx >= 0
+        out[f"{prefix}_lat"] = np.where(found, lat[idx], np.nan)
+        out[f"{prefix}_lon"] = np.where(found, lon[idx], np.nan)
+    return out
+
+def extend_airport_dim(airports: pd.DataFrame, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Wie build_airport_dim, aber gegen eine bestehende Flughafen-Tabelle: neue Flughäfen
+    werden hinten angehängt, bestehende airport_ids bleiben unverändert.
+    """
+    flights, batch_airports = build_airport_dim(df)
+    new = batch_airports[~batch_airports["label"].isin(airports["label"])]
+    if len(new):
+        new = new.assign(airport_id=np.arange(len(airports), len(airports) + len(new), dtype="int32"))
+        airports = pd.concat([airports, new], ignore_index=True)
+
+    labels = pd.Index(airports["label"])
+    for col in ["origin", "destination"]:
+        flights[col] = flights[col].cat.set_categories(labels)
+    return flights, airports
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    pd.concat, bei dem kategoriale Spalten kategorial bleiben: die Kategorien werden vorher
+    vereinigt (geordnete wie month/date_str sortiert, andere in Reihenfolge des Auftretens).
+    """
+    frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+
+    frames = [f.copy(deep=False) for f in frames]
+    for col in frames[0].columns:
+        dtypes = [f[col].dtype for f in frames if col in f.columns]
+        if not all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            continue
+        categories = dtypes[0].categories
+        for d in dtypes[1:]:
+            categories = categories.append(d.categories.difference(categories))
+        if dtypes[0].ordered:
+            categories = categories.sort_values()
+        for f in frames:
+            if col in f.columns and not f[col].cat.categories.equals(categories):
+                f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+def _dedup_hashes(df: pd.DataFrame, key: list[str]) -> np.ndarray:
+    # Hash über die Werte (nicht die Kategorie-Codes bzw. Zeitauflösung), damit alte und neue Frames vergleichbar sind
+    parts = []
+    for c in key:
+        col = df[c]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype("object")
+        elif pd.api.types.is_datetime64_any_dtype(col):
+            col = col.astype("datetime64[ns]")
+        parts.append(col)
+    return pd.util.hash_pandas_object(pd.concat(parts, axis=1), index=False).to_numpy()
+
+@timed()
+def append_flights(
+    existing: pd.DataFrame,
+    batch: pd.DataFrame,
+    mapping: dict | None = None,
+    airports: pd.DataFrame | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame | None, dict]:
+    """
+    Hängt neue Flüge an einen bestehenden (finalisierten) Datensatz an, ohne diesen neu
+    einzulesen: nur der neue Block wird gemappt, validiert und finalisiert. Flüge, die
+    (nach DEDUP_KEY) schon vorhanden sind oder im Block doppelt vorkommen, werden verworfen.
+    Ist existing kompakt (build_airport_dim), wird airports mitgeführt und erweitert.
+    Rückgabe: (gesamt, nur_neue_flüge, airports, prüfbericht mit "added"/"duplicates").
+    Mit metrics.update_cube lässt sich der Cube dann aus nur_neue_flüge nachführen.
+    """
+    batch = coerce_flights_df(apply_mapping(normalize_column_names(batch), mapping or {}))
+    report = validation_report(batch)
+    report["added"], report["duplicates"] = 0, 0
+    if not report["ok"]:
+        return existing, existing.iloc[:0], airports, report
+
+    batch = finalize_df(batch)
+    if airports is not None:
+        batch, airports = extend_airport_dim(airports, batch)
+
+    key = [c for c in DEDUP_KEY if c in existing.columns and c in batch.columns]
+    batch_hashes = _dedup_hashes(batch, key)
+    fresh = ~pd.Series(batch_hashes).duplicated().to_numpy()
+    fresh &= ~np.isin(batch_hashes, _dedup_hashes(existing, key))
+    added = _keep_rows(batch, pd.Series(fresh))
+
+    report["added"] = len(added)
+    report["duplicates"] = len(batch) - len(added)
+    if not len(added):
+        return existing, added, airports, report
+    return concat_frames([existing, added]), added, airports, report
+
+def file_fingerprint(path: str) -> str:
+    """
+    Fingerprint einer Datei über Pfad, Größe und Änderungszeit (ohne den Inhalt zu lesen).
+    """
+    stat = os.stat(path)
+    return f"file:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def _upload_digest(uploaded_file) -> str:
+    if hasattr(uploaded_file, "getvalue"):
+        content = uploaded_file.getvalue()
+    else:
+        uploaded_file.seek(0)
+        content = uploaded_file.read()
+        uploaded_file.seek(0)
+    return "upload:" + hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def upload_fingerprint(uploaded_file) -> str:
+    """
+    Inhalts-Hash einer hochgeladenen Datei (Streamlit-UploadedFile oder File-Objekt).
+    Streamlit-Uploads werden pro file_id nur einmal gehasht, nicht bei jedem Rerun.
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is None:
+        return _upload_digest(uploaded_file)
+    return UPLOAD_CACHE.get_or_build(("digest", file_id), lambda: _upload_digest(uploaded_file))
+
+def mapping_fingerprint(mapping: dict) -> tuple:
+    return tuple(sorted(mapping.items()))
+
+def has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Speichersparende Typen: float32-Koordinaten, kategoriale Flughäfen, kleine Jahres-Ints.
+    Distanz/Dauer/CO₂ bleiben unverändert, damit Summen über Millionen Flüge exakt bleiben.
+    """
+    for c in ["orig_lat", "orig_lon", "dest_lat", "dest_lon"]:
+        if c in df.columns:
+            df[c] = df[c].astype("float32")
+    for c in ["origin", "destination"]:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    if "year" in df.columns:
+        df["year"] = df["year"].astype("int16")
     return df
 
-def load_default_csv() -> pd.DataFrame:
-    df = pd.read_csv("data/drake_flights.csv")
+def columnar_path(path: str) -> str:
+    """
+    Pfad der Parquet-Kopie zu einer CSV, z. B. data/.columnar/drake_flights.v2.parquet
+    """
+    folder, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, COLUMNAR_DIR, f"{stem}.v{COLUMNAR_VERSION}.parquet")
+
+def _source_stamp(path: str) -> bytes:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+def _columnar_is_fresh(path: str, sidecar: str) -> bool:
+    """
+    Die Kopie gilt nur, wenn Größe und Änderungszeit der CSV exakt zu den beim Schreiben
+    gespeicherten Werten passen (auch eine ersetzte Datei mit älterem Zeitstempel fällt auf).
+    """
+    if not os.path.exists(sidecar):
+        return False
+    import pyarrow.parquet as pq
+
+    try:
+        metadata = pq.read_metadata(sidecar).metadata or {}
+    except Exception:
+        return False  # z. B. abgebrochener Schreibvorgang eines alten Stands
+    return metadata.get(COLUMNAR_SOURCE_KEY) == _source_stamp(path)
+
+def _write_columnar(df: pd.DataFrame, sidecar: str, source: str) -> None:
+    # Erst in eine temporäre Datei schreiben, damit parallele Leser nie eine halbe Datei sehen
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), COLUMNAR_SOURCE_KEY: _source_stamp(source)})
+    # Eindeutiger Name pro Aufruf: Sessions sind Threads desselben Prozesses und schreiben sonst dieselbe Datei
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(sidecar))
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp)
+        os.replace(tmp, sidecar)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+@timed()
+def load_flights_file(path: str, memory_map: bool = False) -> pd.DataFrame:
+    """
+    Lädt eine Flug-Datei (CSV oder Parquet).
+    Beim ersten Lesen einer CSV wird eine typisierte Parquet-Kopie geschrieben und danach
+    statt der CSV gelesen (ohne erneutes to_numeric/to_datetime). Ohne pyarrow: nur CSV.
+    """
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, engine="pyarrow", memory_map=memory_map)
+        if "month" not in df.columns:
+            _add_time_cols(df)  # Stream-Speicher enthält nur die Basisspalten
+        return compact_dtypes(df)
+
+    sidecar = columnar_path(path)
+    if has_pyarrow() and _columnar_is_fresh(path, sidecar):
+        return pd.read_parquet(sidecar, engine="pyarrow", memory_map=memory_map)
+
+    df = read_csv_any(path)
     df = normalize_column_names(df)
     df = finalize_df(df)
+    df = compact_dtypes(df)
+
+    if has_pyarrow():
+        try:
+            _write_columnar(df, sidecar, path)
+        except OSError:
+            pass  # z. B. schreibgeschütztes Datenverzeichnis – dann eben nur CSV
     return df
 
+def load_default_csv(path: str = CSV_PATH) -> pd.DataFrame:
+    """
+    Lädt den Standard-Datensatz. Solange sich die Datei nicht ändert, kommt das
+    Ergebnis aus dem Cache (Rückgabe daher nicht in-place verändern).
+    """
+    key = ("default", file_fingerprint(path))
+    return DATASET_CACHE.get_or_build(key, lambda: load_flights_file(path))
+
+@timed()
+def load_default_dataset(path: str = CSV_PATH) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Standard-Datensatz als (kompakte Flüge, Flughafen-Dimension), siehe build_airport_dim.
+    Baut auf load_default_csv auf: Dashboard und Datenquellen teilen sich einen geparsten Datensatz.
+    """
+    key = ("dataset", file_fingerprint(path))
+    return DATASET_CACHE.get_or_build(key, lambda: build_airport_dim(load_default_csv(path)))
+
+# Abfragen: Filter als dict, z. B. {"years": (2022, 2024), "origins": ["Toronto (YYZ)"], "distance_km": (500, None)}
+# Bereiche sind (von, bis) inklusive, None = offen.
+QUERY_RANGE_COLUMNS = ["distance_km", "co2_kg"]
+QUERY_SET_COLUMNS = {"origins": "origin", "destinations": "destination"}
+
+def make_query(
+    years: tuple | None = None,
+    dates: tuple | None = None,
+    origins: list[str] | None = None,
+    destinations: list[str] | None = None,
+    distance_km: tuple | None = None,
+    co2_kg: tuple | None = None,
+) -> dict:
+    """
+    Baut eine Abfrage; leere Filter werden weggelassen (leeres dict = alle Flüge).
+    """
+    query = {
+        "years": years, "dates": dates, "origins": origins, "destinations": destinations,
+        "distance_km": distance_km, "co2_kg": co2_kg,
+    }
+    return {k: v for k, v in query.items() if v is not None and len(v) and any(x is not None for x in v)}
+
+def query_fingerprint(query: dict) -> tuple:
+    return tuple(sorted((k, tuple(v)) for k, v in query.items()))
+
+def query_year_span(query: dict) -> tuple[int | None, int | None]:
+    """
+    Jahre, die eine Abfrage höchstens betrifft (für das Überspringen ganzer Dateien/Partitionen).
+    """
+    lo, hi = query.get("years", (None, None))
+    d_lo, d_hi = query.get("dates", (None, None))
+    if d_lo is not None:
+        lo = max(lo or 0, pd.Timestamp(d_lo).year)
+    if d_hi is not None:
+        hi = min(hi or 9999, pd.Timestamp(d_hi).year)
+    return lo, hi
+
+def query_predicates(query: dict) -> list[tuple[str, str, object]]:
+    """
+    Abfrage als Liste (spalte, operator, wert) – dieselbe Form wie pyarrow-Filter.
+    Jahre werden als Datumsbereich formuliert, damit auch Dateien ohne year-Spalte gefiltert werden.
+    """
+    predicates = []
+    lo, hi = query.get("years", (None, None))
+    d_lo, d_hi = query.get("dates", (None, None))
+    starts = [pd.Timestamp(year=lo, month=1, day=1)] if lo is not None else []
+    ends = [pd.Timestamp(year=hi + 1, month=1, day=1)] if hi is not None else []
+    if d_lo is not None:
+        starts.append(pd.Timestamp(d_lo).normalize())
+    if d_hi is not None:
+        ends.append(pd.Timestamp(d_hi).normalize() + pd.Timedelta(days=1))
+    if starts:
+        predicates.append(("date", ">=", max(starts)))
+    if ends:
+        predicates.append(("date", "<", min(ends)))
+
+    for key, col in QUERY_SET_COLUMNS.items():
+        if key in query:
+            predicates.append((col, "in", list(query[key])))
+    for col in QUERY_RANGE_COLUMNS:
+        lo, hi = query.get(col, (None, None))
+        if lo is not None:
+            predicates.append((col, ">=", lo))
+        if hi is not None:
+            predicates.append((col, "<=", hi))
+    return predicates
+
+def query_mask(df: pd.DataFrame, query: dict) -> np.ndarray:
+    """
+    Boolesche Maske für einen bereits geladenen DataFrame (Fallback ohne Pushdown).
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in query_predicates(query):
+        values = df[col]
+        if op == "in":
+            mask &= values.isin(value).to_numpy()
+        elif op == ">=":
+            mask &= (values >= value).to_numpy(na_value=False)
+        elif op == "<=":
+            mask &= (values <= value).to_numpy(na_value=False)
+        elif op == "<":
+            mask &= (values < value).to_numpy(na_value=False)
+    return mask
+
+@timed()
+def query_frame(df: pd.DataFrame, query: dict) -> pd.DataFrame:
+    """
+    Wendet eine Abfrage auf einen geladenen DataFrame an (ohne Kopie, wenn nichts gefiltert wird).
+    """
+    if not query:
+        return df
+    mask = query_mask(df, query)
+    return df if mask.all() else df.take(np.flatnonzero(mask))
+
+def has_duckdb() -> bool:
+    return importlib.util.find_spec("duckdb") is not None
+
+def _query_sql(predicates: list[tuple[str, str, object]]) -> tuple[str, list]:
+    clauses, params = [], []
+    for col, op, value in predicates:
+        if op == "in":
+            clauses.append(f'"{col}" IN ({", ".join("?" * len(value))})' if value else "FALSE")
+            params.extend(value)
+        else:
+            clauses.append(f'"{col}" {op} ?')
+            params.append(value.to_pydatetime() if isinstance(value, pd.Timestamp) else value)
+    return " AND ".join(clauses) or "TRUE", params
+
+@timed()
+def load_flights_query(path: str, query: dict, engine: str = "auto") -> pd.DataFrame:
+    """
+    Lädt nur die Flüge, die zur Abfrage passen: Die Filter werden an den Parquet-Leser
+    (pyarrow) bzw. an DuckDB übergeben, nicht passende Zeilen werden nie als DataFrame erzeugt.
+    engine: "auto" (DuckDB, falls installiert, sonst pyarrow), "duckdb", "pyarrow".
+    Eine CSV ohne aktuelle Parquet-Kopie wird einmal komplett gelesen (und die Kopie geschrieben).
+    """
+    if not query:
+        return load_flights_file(path)
+
+    source = path if path.endswith(".parquet") else columnar_path(path)
+    if source != path and not (has_pyarrow() and _columnar_is_fresh(path, source)):
+        return query_frame(load_flights_file(path), query)
+
+    predicates = query_predicates(query)
+    if engine == "duckdb" or (engine == "auto" and has_duckdb()):
+        import duckdb
+
+        where, params = _query_sql(predicates)
+        with duckdb.connect() as con:
+            df = con.execute(f"SELECT * FROM read_parquet(?) WHERE {where}", [source, *params]).df()
+    else:
+        df = pd.read_parquet(source, engine="pyarrow", filters=predicates)
+
+    # Zeitspalten neu aufbauen: Kategorien nur aus den tatsächlich geladenen Tagen/Monaten
+    df = df.drop(columns=["date_str", "month", "year"], errors="ignore")
+    _add_time_cols(df)
+    return compact_dtypes(df)
+
+@timed()
+def load_upload_raw(uploaded_file) -> pd.DataFrame:
+    """
+    Liest einen Upload ein und normalisiert die Spaltennamen (gecacht über den Inhalts-Hash).
+    """
+    def build():
+        uploaded_file.seek(0)
+        return normalize_column_names(read_csv_any(uploaded_file))
+
+    key = ("raw", upload_fingerprint(uploaded_file))
+    return DATASET_CACHE.get_or_build(key, build)
+
+@timed()
+def prepare_upload(uploaded_file, mapping: dict) -> tuple[dict, pd.DataFrame | None]:
+    """
+    Mapping anwenden, validieren und finalisieren (gecacht über Upload-Hash + Mapping).
+    Erst eine Stichprobe prüfen: ein offensichtlich falsches Mapping scheitert dort schon,
+    ohne dass die ganze Datei konvertiert wird. Sonst einmal konvertieren, voll prüfen
+    und die konvertierten Spalten direkt an finalize_df weitergeben.
+    Rückgabe: (prüfbericht, fertiger DataFrame oder None)
+    """
+    def build():
+        mapped = apply_mapping(load_upload_raw(uploaded_file), mapping)
+        if len(mapped) > VALIDATION_SAMPLE_ROWS:
+            quick = validation_report(mapped, sample_size=VALIDATION_SAMPLE_ROWS)
+            if not quick["ok"]:
+                return quick, None
+
+        mapped = coerce_flights_df(mapped)
+        report = validation_report(mapped)
+        if not report["ok"]:
+            return report, None
+        return report, finalize_df(mapped)
+
+    key = ("upload", upload_fingerprint(uploaded_file), mapping_fingerprint(mapping))
+    return DATASET_CACHE.get_or_build(key, build)
+
+
+def upload_size(uploaded_file) -> int:
+    if hasattr(uploaded_file, "size"):
+        return uploaded_file.size
+    return len(uploaded_file.getvalue())
+
+def is_large_upload(uploaded_file) -> bool:
+    return has_pyarrow() and upload_size(uploaded_file) > STREAM_THRESHOLD_BYTES
+
+def read_csv_preview(uploaded_file, nrows: int = 1000) -> pd.DataFrame:
+    """
+    Liest nur die ersten Zeilen (für Spaltenauswahl/Mapping bei großen Dateien),
+    gecacht über den Upload-Hash.
+    """
+    def build():
+        dialect = sniff_csv(uploaded_file)
+        df = parse_grouped_numbers(pd.read_csv(uploaded_file, nrows=nrows, **_csv_kwargs(dialect)), dialect)
+        uploaded_file.seek(0)
+        return normalize_column_names(df)
+
+    return UPLOAD_CACHE.get_or_build(("preview", upload_fingerprint(uploaded_file), nrows), build)
+
+# Feste Spaltentypen des Parquet-Zwischenspeichers: jeder Block wird gegen dasselbe Schema gebaut,
+# damit z. B. ganzzahlige Werte im ersten Block spätere Kommazahlen nicht abschneiden
+STREAM_FLOAT_COLUMNS = NUMERIC_COLUMNS + COORD_COLUMNS
+STREAM_LABEL_COLUMNS = ["origin", "destination", "tail", "aircraft_type", "geo_status"]
+
+def _stream_schema(chunk: pd.DataFrame):
+    """
+    Parquet-Schema für alle Blöcke, festgelegt nach Spaltenrolle statt nach den Werten des
+    ersten Blocks: Zahlen float64, Flughäfen/Labels als Dictionary, Datum in Mikrosekunden.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for col in chunk.columns:
+        dtype = chunk[col].dtype
+        if col == "date" or pd.api.types.is_datetime64_any_dtype(dtype):
+            kind = pa.timestamp("us")
+        elif col == "year":
+            kind = pa.int16()
+        elif col in STREAM_LABEL_COLUMNS or isinstance(dtype, pd.CategoricalDtype):
+            kind = pa.dictionary(pa.int32(), pa.string())
+        elif pd.api.types.is_bool_dtype(dtype):
+            kind = pa.bool_()
+        elif col in STREAM_FLOAT_COLUMNS or pd.api.types.is_numeric_dtype(dtype):
+            kind = pa.float64()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(col, kind))
+    return pa.schema(fields)
+
+def stream_csv_to_parquet(
+    file,
+    dest: str,
+    mapping: dict,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    on_progress: Callable[[float, int], None] | None = None,
+) -> tuple[bool, list[str], int]:
+    """
+    Liest eine CSV blockweise (normalisieren → mappen → validieren → finalisieren)
+    und hängt jeden Block an eine Parquet-Datei an. Es liegt nie die ganze Datei als
+    DataFrame im Speicher. on_progress(anteil, zeilen) wird nach jedem Block aufgerufen.
+    Rückgabe: (ok, fehler, geschriebene Zeilen)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    dialect = sniff_csv(file)
+    total = max(upload_size(file), 1)
+    # Eigener Lesepuffer über denselben Bytes (keine Kopie): pandas schließt ihn beim Abbruch,
+    # der Upload selbst bleibt für spätere Reruns offen
+    source = io.BytesIO(file.getvalue()) if hasattr(file, "getvalue") else file
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    # Eindeutiger Name pro Aufruf (Sessions sind Threads desselben Prozesses)
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(dest) or ".")
+    os.close(fd)
+
+    writer = None
+    rows = 0
+    try:
+        for i, chunk in enumerate(pd.read_csv(source, chunksize=chunk_rows, **_csv_kwargs(dialect))):
+            chunk = parse_grouped_numbers(chunk, dialect)
+            chunk = coerce_flights_df(apply_mapping(normalize_column_names(chunk), mapping))
+            ok, errors = validate_flights_df(chunk)
+            if not ok:
+                return False, [f"Block {i + 1}: {e}" for e in errors], rows
+
+            # Abgeleitete Kategorien (date_str/month) werden erst nach dem Laden gebildet,
+            # damit alle Blöcke dasselbe Schema haben
+            chunk = finalize_df(chunk).drop(columns=["date_str", "month"])
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, _stream_schema(chunk))
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+
+            rows += len(chunk)
+            if on_progress is not None:
+                on_progress(min(source.tell() / total, 1.0), rows)
+
+        if writer is None:
+            return False, ["Die CSV enthält keine Zeilen."], 0
+        writer.close()
+        writer = None
+        os.replace(tmp, dest)
+        return True, [], rows
+    finally:
+        # Bei Abbruch (ungültiger Block, Lesefehler) keine halbe Datei liegen lassen
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        file.seek(0)
+
+def cleanup_stream_dir(max_age_s: float = STREAM_MAX_AGE_S) -> int:
+    """
+    Löscht Parquet-Zwischenspeicher in STREAM_DIR, die kein Cache-Eintrag mehr kennt und
+    älter als max_age_s sind. Rückgabe: Anzahl gelöschter Dateien.
+    """
+    if not os.path.isdir(STREAM_DIR):
+        return 0
+    in_use = set(STREAM_FILES.values())
+    cutoff = time.time() - max_age_s
+    removed = 0
+    for entry in os.scandir(STREAM_DIR):
+        if entry.path in in_use or not entry.is_file() or entry.stat().st_mtime > cutoff:
+            continue
+        try:
+            os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass  # gerade von einem anderen Prozess entfernt
+    return removed
+
+@timed()
+def prepare_upload_streamed(
+    uploaded_file,
+    mapping: dict,
+    on_progress: Callable[[float, int], None] | None = None,
+) -> tuple[dict, pd.DataFrame | None]:
+    """
+    Wie prepare_upload, aber für große Dateien: blockweise nach Parquet (STREAM_DIR),
+    danach nur die kompakt typisierte Version laden (memory-mapped).
+    Vorab werden die ersten VALIDATION_SAMPLE_ROWS Zeilen geprüft (keine Stichprobe über
+    die ganze Datei), damit ein falsches Mapping nicht erst nach dem Durchlauf auffällt;
+    jeder Block wird beim Einlesen dann vollständig geprüft.
+    Die Parquet-Datei lebt so lange wie ihr Eintrag im DATASET_CACHE.
+    """
+    fingerprint = upload_fingerprint(uploaded_file)
+    key = ("upload", fingerprint, mapping_fingerprint(mapping))
+
+    def build():
+        preview = apply_mapping(read_csv_preview(uploaded_file, nrows=VALIDATION_SAMPLE_ROWS), mapping)
+        report = validation_report(preview, head_only=True)
+        if not report["ok"]:
+            return report, None
+
+        cleanup_stream_dir()
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        dest = os.path.join(STREAM_DIR, digest + ".parquet")
+        STREAM_FILES[key] = dest
+        if not os.path.exists(dest):
+            ok, errors, _ = stream_csv_to_parquet(uploaded_file, dest, mapping, on_progress=on_progress)
+            if not ok:
+                report["ok"], report["errors"] = False, errors
+                return report, None
+        return report, load_flights_file(dest, memory_map=True)
+
+    return DATASET_CACHE.get_or_build(key, build)
@@ -0,0 +1,182 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Referenztabelle Flughäfen: (IATA-Code, Name, Breite, Länge)
+AIRPORTS = pd.DataFrame(
+    [
+        ("YYZ", "Toronto", 43.6777, -79.6248),
+        ("YHM", "Hamilton", 43.1736, -79.9350),
+        ("YUL", "Montreal", 45.4706, -73.7408),
+        ("OPF", "Miami", 25.9070, -80.2784),
+        ("VNY", "Los Angeles", 34.2098, -118.4896),
+        ("TEB", "New York", 40.8501, -74.0608),
+        ("JFK", "New York", 40.6413, -73.7781),
+        ("EWR", "Newark", 40.6895, -74.1745),
+        ("LAS", "Las Vegas", 36.0840, -115.1537),
+        ("MDW", "Chicago", 41.7868, -87.7522),
+        ("HOU", "Houston", 29.6454, -95.2789),
+        ("PHX", "Phoenix", 33.4342, -112.0116),
+        ("ASE", "Aspen", 39.2232, -106.8688),
+        ("SXM", "St. Maarten", 18.0410, -63.1089),
+        ("SBH", "St. Barts", 17.9044, -62.8436),
+        ("PLS", "Providenciales", 21.7736, -72.2659),
+        ("BGI", "Barbados", 13.0746, -59.4925),
+        ("STN", "London", 51.8850, 0.2350),
+        ("LHR", "London", 51.4700, -0.4543),
+        ("LBG", "Paris", 48.9694, 2.4414),
+        ("CDG", "Paris", 49.0097, 2.5479),
+        ("AMS", "Amsterdam", 52.3105, 4.7683),
+        ("BER", "Berlin", 52.3667, 13.5033),
+        ("FRA", "Frankfurt", 50.0379, 8.5622),
+        ("MUC", "München", 48.3537, 11.7750),
+        ("HAM", "Hamburg", 53.6304, 9.9882),
+        ("CGN", "Köln/Bonn", 50.8659, 7.1427),
+        ("ZRH", "Zürich", 47.4582, 8.5555),
+        ("GVA", "Genf", 46.2370, 6.1092),
+        ("NCE", "Nizza", 43.6584, 7.2159),
+        ("OLB", "Olbia", 40.8987, 9.5176),
+        ("IBZ", "Ibiza", 38.8729, 1.3731),
+        ("PMI", "Palma", 39.5517, 2.7388),
+        ("BCN", "Barcelona", 41.2974, 2.0833),
+        ("FCO", "Rom", 41.8003, 12.2389),
+        ("DXB", "Dubai", 25.2532, 55.3657),
+    ],
+    columns=["code", "name", "lat", "lon"],
+)
+
+# Label wie im Drake-Datensatz, z. B. "Toronto (YYZ)"
+AIRPORTS["label"] = AIRPORTS["name"] + " (" + AIRPORTS["code"] + ")"
+
+
+# Spaltennamen externer Flughafenlisten (z. B. airports.csv von OurAirports) → Namen wie in AIRPORTS
+REFERENCE_COLUMNS = {
+    "code": ["code", "iata_code", "iata", "ident"],
+    "name": ["name", "municipality", "city"],
+    "lat": ["lat", "latitude_deg", "latitude"],
+    "lon": ["lon", "longitude_deg", "longitude"],
+}
+
+
+def load_airport_reference(path: str) -> pd.DataFrame:
+    """
+    Eigene Flughafen-Referenz aus einer CSV (z. B. airports.csv von OurAirports) im Format von
+    AIRPORTS: code, name, lat, lon, label. Pro Zielspalte gilt die erste vorhandene Quellspalte
+    aus REFERENCE_COLUMNS; Zeilen ohne Code oder Position entfallen.
+    """
+    raw = pd.read_csv(path, dtype={"iata_code": "string", "ident": "string", "code": "string"})
+    columns = {}
+    for target, candidates in REFERENCE_COLUMNS.items():
+        source = next((c for c in candidates if c in raw.columns), None)
+        if source is None:
+            raise ValueError(f"Flughafenliste ohne Spalte für {target!r} (erwartet: {', '.join(candidates)})")
+        columns[target] = raw[source]
+    airports = pd.DataFrame(columns)
+    airports["code"] = airports["code"].astype("string").str.strip().str.upper()
+    airports["lat"] = pd.to_numeric(airports["lat"], errors="coerce")
+    airports["lon"] = pd.to_numeric(airports["lon"], errors="coerce")
+    airports = airports.dropna(subset=["code", "lat", "lon"])
+    airports = airports[airports["code"] != ""].drop_duplicates("code").reset_index(drop=True)
+    airports["code"] = airports["code"].astype(object)
+    airports["name"] = airports["name"].fillna(airports["code"]).astype(str)
+    airports["label"] = airports["name"] + " (" + airports["code"] + ")"
+    return airports
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Großkreisdistanz in km, vektorisiert für NumPy-Arrays/Series beliebiger Länge.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype="float64")) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_matrix_km(lat, lon) -> np.ndarray:
+    """
+    Paarweise Distanzen (n × n) zwischen n Punkten, z. B. allen Flughäfen der Referenztabelle.
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    return haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+
+# Nächster-Flughafen-Suche ohne scipy: so viele Punkt×Flughafen-Skalarprodukte pro Block
+NEAREST_BLOCK_CELLS = 2**22
+
+_DEFAULT_INDEX: dict | None = None
+_LAST_INDEX: tuple[pd.DataFrame, dict] | None = None  # zuletzt benutzte eigene Referenztabelle
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    """
+    Positionen als Einheitsvektoren (n × 3) auf der Kugel: der euklidische Abstand
+    (Sehne) wächst monoton mit der Großkreisdistanz, ein KD-Baum findet also den nächsten Flughafen.
+    """
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    lon = np.radians(np.asarray(lon, dtype="float64"))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def build_airport_index(airports: pd.DataFrame = AIRPORTS) -> dict:
+    """
+    Räumlicher Index über eine Flughafentabelle (Spalten lat/lon).
+    Mit scipy ein KD-Baum, sonst blockweise Suche über alle Flughäfen (NumPy).
+    """
+    xyz = unit_vectors(airports["lat"], airports["lon"])
+    tree = None
+    if importlib.util.find_spec("scipy") is not None:
+        from scipy.spatial import cKDTree
+
+        tree = cKDTree(xyz)
+    return {"xyz": xyz, "tree": tree}
+
+
+def airport_index(airports: pd.DataFrame | None = None) -> dict:
+    # Index der Referenztabelle nur einmal pro Prozess aufbauen; eine eigene Tabelle wird bis zur
+    # nächsten anderen wiederverwendet (z. B. über alle Blöcke eines gestreamten Uploads)
+    global _DEFAULT_INDEX, _LAST_INDEX
+    if airports is not None:
+        if _LAST_INDEX is None or _LAST_INDEX[0] is not airports:
+            _LAST_INDEX = (airports, build_airport_index(airports))
+        return _LAST_INDEX[1]
+    if _DEFAULT_INDEX is None:
+        _DEFAULT_INDEX = build_airport_index(AIRPORTS)
+    return _DEFAULT_INDEX
+
+
+def nearest_airport(index: dict, lat, lon) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nächster Flughafen für viele Positionen in einer Abfrage.
+    Rückgabe: (Zeile in der Flughafentabelle, Distanz in km); ohne Position -1 bzw. NaN.
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    nearest = np.full(len(lat), -1, dtype="int64")
+    dist_km = np.full(len(lat), np.nan)
+    known = ~(np.isnan(lat) | np.isnan(lon))
+    if not known.any():
+        return nearest, dist_km
+
+    points = unit_vectors(lat[known], lon[known])
+    if index["tree"] is not None:
+        chord, found = index["tree"].query(points, k=1)
+    else:
+        xyz = index["xyz"]
+        block = max(NEAREST_BLOCK_CELLS // len(xyz), 1)
+        found = np.empty(len(points), dtype="int64")
+        cos = np.empty(len(points))
+        for start in range(0, len(points), block):
+            sims = points[start:start + block] @ xyz.T
+            best = sims.argmax(axis=1)
+            found[start:start + block] = best
+            cos[start:start + block] = sims[np.arange(len(best)), best]
+        chord = np.sqrt(np.clip(2.0 - 2.0 * cos, 0.0, None))
+
+    nearest[known] = found
+    dist_km[known] = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+    return nearest, dist_km
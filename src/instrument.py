@@ -0,0 +1,190 @@
+"""
+Laufzeit-Messung der Hot Paths: Dauer, Zeilen und Speicheränderung pro Aufruf.
+
+    @timed()                        # Funktion messen (Name = Modul.Funktion)
+    with span("st.pydeck_chart"):   # beliebigen Block messen
+
+Pro Streamlit-Rerun sammelt start_run() die Messungen der laufenden Session (Reruns einzelner
+Fragmente: fragment_run()); finish_run() schreibt sie optional als JSON-Lines (PRIVATJET_METRICS_LOG)
+und als Prometheus-Textdatei (PRIVATJET_METRICS_PROM, z. B. für den node_exporter-Textfile-Collector).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+METRICS_LOG_ENV = "PRIVATJET_METRICS_LOG"
+METRICS_PROM_ENV = "PRIVATJET_METRICS_PROM"
+
+# Messungen des laufenden Reruns (pro Thread/Session eigener Kontext) und aktuelle Verschachtelungstiefe
+_RUN: ContextVar[list | None] = ContextVar("instrument_run", default=None)
+_DEPTH: ContextVar[int] = ContextVar("instrument_depth", default=0)
+
+# Prozessweite Summen pro Messpunkt für den Prometheus-Export
+_TOTALS: dict[str, dict[str, float]] = {}
+_TOTALS_LOCK = threading.Lock()
+
+
+def _rss_mb() -> float | None:
+    """
+    Aktueller Arbeitsspeicher des Prozesses in MB (Linux: /proc, sonst None).
+    Gilt für den ganzen Prozess – bei parallelen Sessions nur ein Richtwert.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _count_rows(result) -> int | None:
+    # Zeilen des ersten DataFrame-artigen Ergebnisses, z. B. (df, airports) oder (report, df)
+    candidates = result if isinstance(result, tuple) else (result,)
+    for item in candidates:
+        if hasattr(item, "shape") and hasattr(item, "columns"):
+            return int(item.shape[0])
+    return None
+
+
+def _add_totals(name: str, seconds: float, rows: int | None) -> None:
+    with _TOTALS_LOCK:
+        totals = _TOTALS.setdefault(name, {"count": 0, "seconds": 0.0, "rows": 0})
+        totals["count"] += 1
+        totals["seconds"] += seconds
+        totals["rows"] += rows or 0
+
+
+@contextmanager
+def span(name: str, rows: int | None = None):
+    """
+    Misst einen Block. Die Zeilenzahl kann vorab übergeben oder im Block über
+    das gelieferte dict gesetzt werden: with span("x") as s: s["rows"] = len(df)
+    """
+    info = {"rows": rows}
+    depth = _DEPTH.get()
+    token = _DEPTH.set(depth + 1)
+
+    # Eintrag schon beim Start anlegen, damit die Reihenfolge der Aufrufreihenfolge entspricht
+    run = _RUN.get()
+    record = {"name": name, "depth": depth, "ms": None, "rows": None, "mem_delta_mb": None}
+    if run is not None:
+        run.append(record)
+
+    mem_before = _rss_mb()
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        mem_after = _rss_mb()
+        _DEPTH.reset(token)
+        record["ms"] = round(seconds * 1000, 3)
+        record["rows"] = info["rows"]
+        if mem_before is not None and mem_after is not None:
+            record["mem_delta_mb"] = round(mem_after - mem_before, 2)
+        _add_totals(name, seconds, info["rows"])
+
+
+def timed(name: str | None = None):
+    """
+    Decorator: misst jeden Aufruf; Zeilen kommen aus dem zurückgegebenen DataFrame.
+    """
+    def decorate(fn):
+        label = name or f"{fn.__module__.removeprefix('src.')}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label) as info:
+                result = fn(*args, **kwargs)
+                info["rows"] = _count_rows(result)
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+def start_run() -> list:
+    """
+    Beginnt die Sammlung für einen Rerun (am Anfang einer Seite aufrufen).
+    """
+    run = []
+    _RUN.set(run)
+    return run
+
+
+def finish_run(run: list, page: str) -> None:
+    """
+    Exportiert die Messungen eines Reruns, falls per Umgebungsvariable eingeschaltet.
+    Danach ist kein Rerun mehr aktiv: spätere Fragment-Reruns sammeln eigenständig (fragment_run).
+    """
+    _RUN.set(None)
+    log_path = os.environ.get(METRICS_LOG_ENV)
+    if log_path:
+        write_jsonl(run, log_path, page=page)
+    prom_path = os.environ.get(METRICS_PROM_ENV)
+    if prom_path:
+        write_prometheus(prom_path)
+
+
+@contextmanager
+def fragment_run(page: str):
+    """
+    Für den Rumpf eines st.fragment: im normalen Seitendurchlauf landen die Messungen in dessen
+    Sammlung, bei einem Rerun nur des Fragments in einem eigenen Durchlauf (exportiert als page).
+    """
+    if _RUN.get() is not None:
+        yield
+        return
+    run = start_run()
+    try:
+        yield
+    finally:
+        finish_run(run, page=page)
+
+
+def write_jsonl(run: list, path: str, page: str = "") -> None:
+    """
+    Hängt die Messungen als JSON-Lines an (eine Zeile pro Messpunkt, gemeinsame run_id).
+    """
+    run_id = uuid.uuid4().hex[:12]
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    with open(path, "a", encoding="utf-8") as f:
+        for record in run:
+            f.write(json.dumps({"ts": ts, "run_id": run_id, "page": page, **record}, ensure_ascii=False) + "\n")
+
+
+def prometheus_text() -> str:
+    """
+    Prozessweite Summen im Prometheus-Textformat.
+    """
+    with _TOTALS_LOCK:
+        totals = {name: dict(values) for name, values in _TOTALS.items()}
+
+    lines = [
+        "# HELP privatjet_span_seconds Laufzeit der instrumentierten Funktionen und Blöcke",
+        "# TYPE privatjet_span_seconds summary",
+    ]
+    for name, values in sorted(totals.items()):
+        lines.append(f'privatjet_span_seconds_sum{{span="{name}"}} {values["seconds"]:.6f}')
+        lines.append(f'privatjet_span_seconds_count{{span="{name}"}} {values["count"]}')
+    lines += [
+        "# HELP privatjet_span_rows_total Verarbeitete Zeilen pro Funktion bzw. Block",
+        "# TYPE privatjet_span_rows_total counter",
+    ]
+    for name, values in sorted(totals.items()):
+        lines.append(f'privatjet_span_rows_total{{span="{name}"}} {values["rows"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str) -> None:
+    # Atomar ersetzen, damit der Collector nie eine halbe Datei liest
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
@@ -1,5 +1,12 @@
 import pandas as pd
 
+from src.data import concat_frames
+from src.instrument import timed
+
+# Vorab-Aggregat: eine Zeile pro Jahr × Monat × Start × Ziel
+CUBE_DIMENSIONS = ["year", "month", "origin", "destination"]
+
+@timed()
 def compute_kpis(df: pd.DataFrame):
     flights = len(df)
     avg_distance = float(df["distance_km"].mean()) if flights else 0.0
@@ -7,6 +14,22 @@ def compute_kpis(df: pd.DataFrame):
     avg_duration = float(df["flight_time_min"].mean()) if flights else 0.0
     return flights, avg_distance, total_co2_t, avg_duration
 
+@timed()
+def compute_trip_kpis(trips: pd.DataFrame):
+    """
+    Reise-KPIs aus src.trips.build_trips: Anzahl Reisen, Ø CO₂ pro Reise (t),
+    Ø Bodenzeit unterwegs (h, nur Reisen mit Zwischenstopp), Anzahl geschätzter Leerflüge
+    und deren Anteil am CO₂ (%).
+    """
+    n_trips = len(trips)
+    total_co2 = float(trips["co2_kg"].sum()) if n_trips else 0.0
+    avg_trip_co2_t = total_co2 / 1000 / n_trips if n_trips else 0.0
+    with_stop = trips["legs"] > 1 if n_trips else pd.Series(dtype=bool)
+    avg_ground_h = float(trips.loc[with_stop, "ground_h"].mean()) if with_stop.any() else 0.0
+    empty_legs = int(trips["empty_legs"].sum()) if n_trips else 0
+    empty_share = float(trips["co2_empty_kg"].sum()) / total_co2 * 100 if total_co2 else 0.0
+    return n_trips, avg_trip_co2_t, avg_ground_h, empty_legs, empty_share
+
 def compare_to_small_city(total_co2_t: float, population: int = 15000, per_capita_t: float = 8.5):
     """
     Vergleich: Privatjet-CO₂ (in Tonnen) vs. jährliche CO₂-Emissionen einer deutschen Kleinstadt.
@@ -15,3 +38,76 @@ def compare_to_small_city(total_co2_t: float, population: int = 15000, per_capit
     small_city_total_t = population * per_capita_t
     share_percent = (total_co2_t / small_city_total_t * 100) if small_city_total_t > 0 else 0.0
     return small_city_total_t, share_percent
+
+@timed()
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregiert die Flüge einmal pro Datensatz zu Zellen (Jahr × Monat × Start × Ziel)
+    mit Anzahl und Summen. KPIs und Diagramme für beliebige Jahresauswahl lassen sich
+    dann aus dem Cube berechnen, ohne die Einzelflüge erneut zu scannen.
+    *_n zählt die nicht-leeren Werte, damit Mittelwerte exakt wie bei compute_kpis sind.
+    """
+    return (
+        df.groupby(CUBE_DIMENSIONS, observed=True, sort=True, dropna=False)
+        .agg(
+            flights=("date", "size"),
+            distance_sum=("distance_km", "sum"),
+            distance_n=("distance_km", "count"),
+            time_sum=("flight_time_min", "sum"),
+            time_n=("flight_time_min", "count"),
+            co2_sum=("co2_kg", "sum"),
+        )
+        .reset_index()
+    )
+
+@timed()
+def update_cube(cube: pd.DataFrame, new_flights: pd.DataFrame) -> pd.DataFrame:
+    """
+    Führt den Cube für neu angehängte Flüge nach (nur die neuen Flüge werden aggregiert,
+    betroffene Zellen addiert) – Ergebnis identisch zu build_cube über alle Flüge.
+    """
+    if not len(new_flights):
+        return cube
+    return (
+        concat_frames([cube, build_cube(new_flights)])
+        .groupby(CUBE_DIMENSIONS, observed=True, sort=True, dropna=False)
+        .sum()
+        .reset_index()
+    )
+
+def is_cube(df: pd.DataFrame) -> bool:
+    return "flights" in df.columns and "co2_sum" in df.columns
+
+def filter_cube(cube: pd.DataFrame, year: int | None = None) -> pd.DataFrame:
+    if year is None:
+        return cube
+    return cube[cube["year"] == year]
+
+@timed()
+def compute_kpis_from_cube(cube: pd.DataFrame):
+    """
+    Wie compute_kpis, aber aus dem Cube (Aufwand O(Zellen) statt O(Flüge)).
+    """
+    flights = int(cube["flights"].sum())
+    distance_n = cube["distance_n"].sum()
+    time_n = cube["time_n"].sum()
+    avg_distance = float(cube["distance_sum"].sum() / distance_n) if distance_n else 0.0
+    total_co2_t = float(cube["co2_sum"].sum()) / 1000 if flights else 0.0
+    avg_duration = float(cube["time_sum"].sum() / time_n) if time_n else 0.0
+    return flights, avg_distance, total_co2_t, avg_duration
+
+def flights_per_month(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Anzahl Flüge pro Monat – aus Einzelflügen oder aus dem Cube.
+    """
+    if is_cube(df):
+        return df.groupby("month", observed=True)["flights"].sum().reset_index()
+    return df.groupby("month", observed=True).size().reset_index(name="flights")
+
+def co2_per_year(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    CO₂-Summe pro Jahr (Spalten year, co2_kg) – aus Einzelflügen oder aus dem Cube.
+    """
+    if is_cube(df):
+        return df.groupby("year", observed=True)["co2_sum"].sum().rename("co2_kg").reset_index()
+    return df.groupby("year", observed=True)["co2_kg"].sum().reset_index()
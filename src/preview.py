@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.cache import LRUCache
+
+PREVIEW_PAGE_SIZES = [25, 50, 100, 250]
+
+# Sortierreihenfolgen und Spaltenübersichten – eigener Cache, damit sie keine Datensätze verdrängen
+PREVIEW_CACHE = LRUCache(max_entries=16)
+
+
+def _sort_order(series: pd.Series, ascending: bool) -> np.ndarray:
+    """
+    Zeilenpositionen in Sortierreihenfolge, fehlende Werte immer am Ende.
+    Kategorien werden nach ihrem Text sortiert, nicht nach ihrer internen Reihenfolge.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str)
+        rank = np.empty(len(categories), dtype="int64")
+        rank[np.argsort(categories, kind="stable")] = np.arange(len(categories))
+        if not ascending:
+            rank = len(categories) - 1 - rank
+        codes = series.cat.codes.to_numpy()
+        keys = np.where(codes >= 0, rank[np.maximum(codes, 0)], len(categories))
+        return np.argsort(keys, kind="stable")
+
+    ordered = series.reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last")
+    return ordered.index.to_numpy()
+
+
+def _text_mask(series: pd.Series, text: str) -> np.ndarray:
+    """
+    Enthält-Filter (ohne Groß-/Kleinschreibung); bei Kategorien nur einmal pro Kategorie geprüft.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        hits = series.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        codes = series.cat.codes.to_numpy()
+        return (codes >= 0) & np.asarray(hits)[np.maximum(codes, 0)]
+    return series.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+
+
+def preview_positions(
+    df: pd.DataFrame,
+    cache_key: tuple,
+    sort_by: str | None = None,
+    ascending: bool = True,
+    filter_column: str | None = None,
+    filter_text: str = "",
+) -> np.ndarray:
+    """
+    Zeilenpositionen nach Filter und Sortierung. Die Sortierreihenfolge wird pro Datensatz
+    und Spalte einmal berechnet und gecacht; gefiltert wird danach auf dieser Reihenfolge.
+    """
+    if sort_by:
+        positions = PREVIEW_CACHE.get_or_build(
+            ("order",) + cache_key + (sort_by, ascending), lambda: _sort_order(df[sort_by], ascending)
+        )
+    else:
+        positions = np.arange(len(df))
+
+    if filter_column and filter_text:
+        mask = _text_mask(df[filter_column], filter_text)
+        positions = positions[mask[positions]]
+    return positions
+
+
+def column_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Kennzahlen pro Spalte (Typ, Anzahl, fehlend, eindeutig, Min/Max/Mittel) als Text-Tabelle.
+    """
+    rows = []
+    for col in df.columns:
+        s = df[col]
+        row = {"Spalte": col, "Typ": str(s.dtype), "Werte": int(s.count()), "Fehlend": int(s.isna().sum())}
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes = s.cat.codes.to_numpy()
+            row["Eindeutig"] = len(np.unique(codes[codes >= 0]))
+        else:
+            row["Eindeutig"] = int(s.nunique())
+
+        row["Min"] = row["Max"] = row["Mittel"] = ""
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s) and row["Werte"]:
+            row["Min"], row["Max"] = f"{s.min():.2f}", f"{s.max():.2f}"
+            row["Mittel"] = f"{s.mean():.2f}"
+        elif pd.api.types.is_datetime64_any_dtype(s) and row["Werte"]:
+            row["Min"], row["Max"] = str(s.min().date()), str(s.max().date())
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def show_preview(df: pd.DataFrame, key: str, cache_key: tuple) -> None:
+    """
+    Seitenweise Tabellenvorschau: sortiert und gefiltert wird auf dem Server,
+    an den Browser geht nur der sichtbare Ausschnitt.
+    key: Präfix für die Widget-Keys, cache_key: identifiziert den Datensatz (für den Cache).
+    """
+    columns = list(df.columns)
+    text_columns = [c for c in columns if not pd.api.types.is_numeric_dtype(df[c])
+                    and not pd.api.types.is_datetime64_any_dtype(df[c])]
+
+    c1, c2, c3, c4 = st.columns([1.2, 0.8, 1.2, 1.6])
+    sort_by = c1.selectbox("Sortieren nach", ["—"] + columns, key=f"{key}_sort")
+    ascending = c2.radio("Reihenfolge", ["aufsteigend", "absteigend"], key=f"{key}_asc") == "aufsteigend"
+    filter_column = c3.selectbox("Filtern in Spalte", ["—"] + text_columns, key=f"{key}_filter_col")
+    filter_text = c4.text_input("enthält", key=f"{key}_filter_text")
+
+    positions = preview_positions(
+        df,
+        cache_key,
+        sort_by=None if sort_by == "—" else sort_by,
+        ascending=ascending,
+        filter_column=None if filter_column == "—" else filter_column,
+        filter_text=filter_text.strip(),
+    )
+
+    # Neue Sortierung/Filter: zurück auf Seite 1 (die alte Seite gibt es evtl. nicht mehr)
+    view = (sort_by, ascending, filter_column, filter_text)
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[f"{key}_page"] = 1
+
+    p1, p2 = st.columns([1, 3])
+    page_size = p1.selectbox("Zeilen pro Seite", PREVIEW_PAGE_SIZES, index=1, key=f"{key}_size")
+    n_pages = max(-(-len(positions) // page_size), 1)
+    page = min(int(st.session_state.get(f"{key}_page", 1)), n_pages)
+    st.session_state[f"{key}_page"] = page
+    page = p2.number_input("Seite", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    window = df.iloc[positions[start:start + page_size]]
+    st.dataframe(window, use_container_width=True, hide_index=True)
+
+    shown = f"{start + 1 if len(window) else 0:,}–{start + len(window):,}".replace(",", ".")
+    total = f"{len(positions):,}".replace(",", ".")
+    st.caption(f"Zeilen {shown} von {total} · Seite {page} von {n_pages}")
+
+
+def show_column_summary(df: pd.DataFrame, cache_key: tuple) -> None:
+    summary = PREVIEW_CACHE.get_or_build(("summary",) + cache_key, lambda: column_summary(df))
+    st.dataframe(summary, use_container_width=True, hide_index=True)
@@ -0,0 +1,178 @@
+"""
+Berichte ohne Streamlit: KPIs und Diagramme für viele Datensätze, parallel (ein Prozess pro Datei).
+
+Beispiele:
+    python -m src.report data/drake_flights.csv --out reports
+    python -m src.report data/flights --year 2024 --by-month --png --out reports/2024
+
+Eingaben sind Dateien (CSV/Parquet) oder Katalog-Verzeichnisse (tail=…/year=…, siehe src.catalog).
+Ergebnis: kpis.csv, kpis.json und pro Datensatz HTML-Diagramme + Karte unter charts/.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.catalog import scan_catalog
+from src.data import load_flights_file, load_flights_query, make_query
+from src.metrics import build_cube, compare_to_small_city, compute_kpis_from_cube
+from src.timeseries import ROLLING_WINDOWS, daily_series, downsample_minmax, time_series
+
+KPI_COLUMNS = [
+    "source", "tail", "period", "flights", "avg_distance_km", "co2_t",
+    "avg_flight_time_min", "small_city_t", "share_pct",
+]
+
+
+def collect_jobs(inputs: list[str]) -> list[dict]:
+    """
+    Ein Job pro Datei bzw. Katalog-Partition.
+    """
+    jobs = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for row in scan_catalog(item).itertuples():
+                jobs.append({"path": row.path, "name": f"{row.tail}_{row.year}", "tail": row.tail, "year": row.year})
+        else:
+            name = os.path.splitext(os.path.basename(item))[0]
+            jobs.append({"path": item, "name": name, "tail": None, "year": None})
+    return jobs
+
+
+def _kpi_row(cube: pd.DataFrame, job: dict, period: str, population: int, per_capita_t: float) -> dict:
+    flights, avg_distance, total_co2_t, avg_duration = compute_kpis_from_cube(cube)
+    small_city_t, share = compare_to_small_city(total_co2_t, population=population, per_capita_t=per_capita_t)
+    return {
+        "source": job["path"],
+        "tail": job["tail"],
+        "period": period,
+        "flights": flights,
+        "avg_distance_km": round(avg_distance, 1),
+        "co2_t": round(total_co2_t, 3),
+        "avg_flight_time_min": round(avg_duration, 1),
+        "small_city_t": small_city_t,
+        "share_pct": round(share, 4),
+    }
+
+
+def _write_charts(df: pd.DataFrame, cube: pd.DataFrame, folder: str, name: str, png: bool) -> list[str]:
+    # Altair/PyDeck erst hier laden: reine KPI-Läufe starten ohne die Visualisierungs-Pakete
+    from src.viz import chart_co2_by_year, chart_co2_timeline, chart_flights_per_month, make_map
+
+    os.makedirs(folder, exist_ok=True)
+    warnings = []
+    charts = {
+        "flights_per_month": chart_flights_per_month(cube),
+        "co2_by_year": chart_co2_by_year(cube),
+        "co2_timeline": chart_co2_timeline(
+            downsample_minmax(time_series(daily_series(df), "D"), ["co2_t", "co2_rolling_t"]),
+            "Tag", ROLLING_WINDOWS["D"][1],
+        ),
+    }
+    for chart_name, chart in charts.items():
+        base = os.path.join(folder, f"{name}_{chart_name}")
+        chart.save(base + ".html")
+        if png:
+            try:
+                chart.save(base + ".png")
+            except Exception as e:
+                warnings.append(f"{name}: PNG nicht erzeugt ({e})")
+
+    make_map(df).to_html(os.path.join(folder, f"{name}_map.html"), open_browser=False, notebook_display=False)
+    return warnings
+
+
+def run_job(job: dict, options: dict) -> tuple[list[dict], list[str]]:
+    """
+    Lädt einen Datensatz, berechnet KPIs (gesamt und optional pro Monat) und schreibt Diagramme.
+    Rückgabe: (KPI-Zeilen, Warnungen)
+    """
+    query = make_query(years=None if options["year"] is None else (options["year"], options["year"]))
+    df = load_flights_query(job["path"], query) if query else load_flights_file(job["path"])
+    cube = build_cube(df)
+
+    population, per_capita_t = options["population"], options["per_capita_t"]
+    rows = [_kpi_row(cube, job, "gesamt", population, per_capita_t)]
+    if options["by_month"]:
+        for month, cells in cube.groupby("month", observed=True, sort=True):
+            rows.append(_kpi_row(cells, job, str(month), population, per_capita_t))
+
+    warnings = []
+    if options["charts"] and len(df):
+        warnings = _write_charts(df, cube, os.path.join(options["out"], "charts"), job["name"], options["png"])
+    return rows, warnings
+
+
+def _run_job_safe(job: dict, options: dict) -> tuple[list[dict], list[str], str | None]:
+    # Ein fehlerhafter Datensatz soll die übrigen nicht abbrechen
+    try:
+        rows, warnings = run_job(job, options)
+        return rows, warnings, None
+    except Exception as e:
+        return [], [], str(e)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="KPI- und Diagramm-Berichte ohne Streamlit erzeugen")
+    parser.add_argument("inputs", nargs="+", help="CSV/Parquet-Dateien oder Katalog-Verzeichnisse")
+    parser.add_argument("--out", default="reports", help="Ausgabeverzeichnis")
+    parser.add_argument("--year", type=int, help="Nur dieses Jahr auswerten")
+    parser.add_argument("--by-month", action="store_true", help="Zusätzlich KPIs pro Monat")
+    parser.add_argument("--population", type=int, default=15000, help="Einwohner der Vergleichs-Kleinstadt")
+    parser.add_argument("--per-capita", type=float, default=8.5, help="Pro-Kopf-Emissionen (t CO₂/Jahr)")
+    parser.add_argument("--no-charts", action="store_true", help="Nur KPIs, keine Diagramme/Karten")
+    parser.add_argument("--png", action="store_true", help="Diagramme zusätzlich als PNG (vl-convert-python)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Anzahl paralleler Prozesse")
+    args = parser.parse_args(argv)
+
+    jobs = collect_jobs(args.inputs)
+    if args.year is not None:
+        jobs = [j for j in jobs if j["year"] in (None, args.year)]
+    if not jobs:
+        print("Keine Datensätze gefunden.", file=sys.stderr)
+        return 1
+
+    options = {
+        "out": args.out,
+        "year": args.year,
+        "by_month": args.by_month,
+        "population": args.population,
+        "per_capita_t": args.per_capita,
+        "charts": not args.no_charts,
+        "png": args.png,
+    }
+    if args.png and importlib.util.find_spec("vl_convert") is None:
+        print("PNG-Export übersprungen: vl-convert-python ist nicht installiert.", file=sys.stderr)
+        options["png"] = False
+    os.makedirs(args.out, exist_ok=True)
+
+    if args.workers <= 1 or len(jobs) == 1:
+        outcomes = [_run_job_safe(job, options) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+            outcomes = list(pool.map(_run_job_safe, jobs, [options] * len(jobs)))
+
+    rows, failed = [], 0
+    for job, (job_rows, warnings, error) in zip(jobs, outcomes):
+        if error is not None:
+            failed += 1
+            print(f"Fehler bei {job['path']}: {error}", file=sys.stderr)
+        rows.extend(job_rows)
+        for w in warnings:
+            print(w, file=sys.stderr)
+
+    kpis = pd.DataFrame(rows, columns=KPI_COLUMNS)
+    kpis.to_csv(os.path.join(args.out, "kpis.csv"), index=False)
+    with open(os.path.join(args.out, "kpis.json"), "w", encoding="utf-8") as f:
+        json.dump(kpis.to_dict(orient="records"), f, indent=2, ensure_ascii=False)
+
+    print(f"{len(jobs) - failed} von {len(jobs)} Datensätzen ausgewertet: {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Synthetische Flottendaten für Demo und Lasttests.
+
+Beispiel (10 Mio. Flüge direkt nach Parquet, blockweise erzeugt):
+    python -m src.synth --rows 10000000 --aircraft 200 --out data/synthetic.parquet
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.aircraft import AIRCRAFT_TYPES, co2_kg, flight_time_min
+from src.geo import AIRPORTS, distance_matrix_km
+
+SYNTH_CHUNK_ROWS = 1_000_000
+
+# Kürzere Strecken (z. B. JFK ↔ TEB) werden nicht als Ziel gewählt
+MIN_LEG_KM = 150
+
+# Anteil der Typen in einer generierten Flotte (Reihenfolge wie AIRCRAFT_TYPES)
+FLEET_TYPE_WEIGHTS = [0.05, 0.30, 0.15, 0.25, 0.15, 0.10]
+
+
+def make_fleet(n_aircraft: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Flotte mit Kennzeichen (N-Nummern), Flugzeugtyp und Heimatflughafen (Index in AIRPORTS).
+    """
+    rng = np.random.default_rng(seed)
+    letters = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+    # Eindeutige Kennzeichen N100AA … N999ZZ ohne Wiederholung ziehen
+    codes = rng.choice(900 * len(letters) ** 2, size=n_aircraft, replace=False)
+    numbers, rest = np.divmod(codes, len(letters) ** 2)
+    first, second = np.divmod(rest, len(letters))
+    return pd.DataFrame({
+        "tail": [f"N{100 + num}{letters[a]}{letters[b]}" for num, a, b in zip(numbers, first, second)],
+        "aircraft_type": rng.choice(AIRCRAFT_TYPES.index, size=n_aircraft, p=FLEET_TYPE_WEIGHTS),
+        "home": rng.integers(0, len(AIRPORTS), size=n_aircraft),
+    })
+
+
+def generate_flights(
+    n: int,
+    n_aircraft: int = 10,
+    seed: int = 42,
+    start: str = "2019-01-01",
+    end: str = "2025-12-31",
+    fleet: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Erzeugt n Flüge (vektorisiert) im Zeitraum start–end.
+    Jedes Flugzeug fliegt Umläufe Heimatbasis → Ziel → Heimatbasis (wie im Drake-Datensatz),
+    Ziele liegen in Reichweite des Typs. Distanzen sind Großkreisdistanzen zwischen echten
+    Flughäfen, Dauer und CO₂ kommen aus dem Leistungsmodell des Typs (src.aircraft).
+    """
+    rng = np.random.default_rng(seed)
+    if fleet is None:
+        fleet = make_fleet(n_aircraft, seed=seed)
+
+    # Flüge nach Flugzeug und Datum sortieren; gerade Flüge pro Flugzeug = Hinflug, ungerade = Rückflug
+    first_day = np.datetime64(start, "D")
+    n_days = int((np.datetime64(end, "D") - first_day).astype(int)) + 1
+    aircraft = rng.integers(0, len(fleet), size=n)
+    day = rng.integers(0, n_days, size=n)
+    order = np.lexsort((day, aircraft))
+    aircraft, day = aircraft[order], day[order]
+
+    starts = np.flatnonzero(np.r_[True, aircraft[1:] != aircraft[:-1]][:n])
+    rank = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+    outbound = rank % 2 == 0
+
+    fleet_types = pd.Categorical(fleet["aircraft_type"], categories=AIRCRAFT_TYPES.index)
+    home = fleet["home"].to_numpy()[aircraft]
+    type_codes = fleet_types.codes[aircraft]
+
+    lat = AIRPORTS["lat"].to_numpy()
+    lon = AIRPORTS["lon"].to_numpy()
+    labels = AIRPORTS["label"].to_numpy()
+    distances = distance_matrix_km(lat, lon)
+
+    # Ein Ziel pro Umlauf, gezogen je Kombination (Heimatbasis, Typ) aus den erreichbaren Flughäfen
+    trip = np.cumsum(outbound) - 1
+    trip_combo = home[outbound] * len(AIRCRAFT_TYPES) + type_codes[outbound]
+    trip_order = np.argsort(trip_combo, kind="stable")
+    combos, combo_starts, combo_counts = np.unique(trip_combo[trip_order], return_index=True, return_counts=True)
+    away = np.empty(len(trip_combo), dtype="int64")
+    for combo, lo, count in zip(combos, combo_starts, combo_counts):
+        base, type_code = divmod(combo, len(AIRCRAFT_TYPES))
+        reach = AIRCRAFT_TYPES["range_km"].iloc[type_code]
+        candidates = np.flatnonzero((distances[base] >= MIN_LEG_KM) & (distances[base] <= reach))
+        if len(candidates) == 0:
+            candidates = np.argsort(distances[base])[1:4]  # abgelegene Basis: nächste Flughäfen
+        away[trip_order[lo:lo + count]] = rng.choice(candidates, size=count)
+
+    orig = np.where(outbound, home, away[trip])
+    dest = np.where(outbound, away[trip], home)
+    distance = distances[orig, dest]
+
+    # Kennzeichen und Typ als Kategorien (ein Code pro Zeile statt eines Strings)
+    types = pd.Categorical.from_codes(type_codes, categories=AIRCRAFT_TYPES.index)
+    tails = pd.Categorical.from_codes(aircraft, categories=fleet["tail"])
+
+    # ±5 % Streuung für Wetter, Routenführung und Beladung
+    minutes = flight_time_min(distance, types) * rng.normal(1.0, 0.05, size=n)
+    co2 = co2_kg(minutes, types) * rng.normal(1.0, 0.05, size=n)
+
+    return pd.DataFrame({
+        "date": first_day + day.astype("timedelta64[D]"),
+        "tail": tails,
+        "aircraft_type": types,
+        "origin": pd.Categorical.from_codes(orig, categories=labels),
+        "destination": pd.Categorical.from_codes(dest, categories=labels),
+        "distance_km": distance.round(0),
+        "flight_time_min": minutes.round(0),
+        "co2_kg": co2.round(0),
+        "orig_lat": lat[orig],
+        "orig_lon": lon[orig],
+        "dest_lat": lat[dest],
+        "dest_lon": lon[dest],
+    })
+
+
+def iter_flight_chunks(
+    n: int,
+    chunk_rows: int = SYNTH_CHUNK_ROWS,
+    n_aircraft: int = 10,
+    seed: int = 42,
+    start: str = "2019-01-01",
+    end: str = "2025-12-31",
+):
+    """
+    Liefert n Flüge in Blöcken zu chunk_rows. Jeder Block deckt einen eigenen,
+    aufeinanderfolgenden Zeitabschnitt ab (innerhalb des Blocks nach Flugzeug und Datum
+    sortiert). Die Flotte ist über alle Blöcke dieselbe.
+    """
+    fleet = make_fleet(n_aircraft, seed=seed)
+    n_chunks = max(-(-n // chunk_rows), 1)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    edges = pd.date_range(start, end, periods=n_chunks + 1).normalize()
+
+    for i in range(n_chunks):
+        rows = min(chunk_rows, n - i * chunk_rows)
+        chunk_end = edges[i + 1] - pd.Timedelta(days=1) if i < n_chunks - 1 else edges[i + 1]
+        yield generate_flights(
+            rows,
+            seed=int(seeds[i].generate_state(1)[0]),
+            start=str(edges[i].date()),
+            end=str(max(chunk_end, edges[i]).date()),
+            fleet=fleet,
+        )
+
+
+def write_flights(path: str, n: int, chunk_rows: int = SYNTH_CHUNK_ROWS, **kwargs) -> int:
+    """
+    Schreibt n synthetische Flüge blockweise nach CSV oder Parquet (je nach Endung),
+    ohne den ganzen Datensatz im Speicher zu halten. Rückgabe: geschriebene Zeilen.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    rows = 0
+
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in iter_flight_chunks(n, chunk_rows=chunk_rows, **kwargs):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    for i, chunk in enumerate(iter_flight_chunks(n, chunk_rows=chunk_rows, **kwargs)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False, date_format="%Y-%m-%d")
+        rows += len(chunk)
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Synthetische Privatjet-Flüge erzeugen")
+    parser.add_argument("--rows", type=int, required=True, help="Anzahl Flüge")
+    parser.add_argument("--aircraft", type=int, default=10, help="Anzahl Flugzeuge in der Flotte")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=SYNTH_CHUNK_ROWS)
+    parser.add_argument("--out", required=True, help="Zieldatei (.csv oder .parquet)")
+    args = parser.parse_args(argv)
+
+    rows = write_flights(args.out, args.rows, chunk_rows=args.chunk_rows, n_aircraft=args.aircraft, seed=args.seed)
+    print(f"{rows:,} Flüge geschrieben: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
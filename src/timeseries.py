@@ -0,0 +1,88 @@
+"""
+Zeitreihen für die Diagramme: Werte pro Tag/Woche/Monat, gleitende Summe und kumuliertes CO₂.
+
+    daily = daily_series(df)                   # lückenlos, ein Eintrag pro Kalendertag
+    series = time_series(daily, "W")           # Wochenwerte + gleitende Summe + kumuliert
+    series = downsample_minmax(series, ["co2_t", "co2_rolling_t"])
+
+Die Ausdünnung behält pro Zeitfenster die Minimal- und Maximalwerte, damit Spitzen sichtbar
+bleiben – an den Browser gehen höchstens MAX_CHART_POINTS Zeilen, egal wie lang der Zeitraum ist.
+"""
+import numpy as np
+import pandas as pd
+
+from src.instrument import timed
+
+MAX_CHART_POINTS = 2000
+
+# Auflösung → Resample-Regel (Tageswerte kommen direkt aus daily_series)
+RESAMPLE_RULES = {"D": None, "W": "W-MON", "M": "MS"}
+
+# Fenster der gleitenden Summe pro Auflösung (Anzahl Zeiträume) und Beschriftung
+ROLLING_WINDOWS = {"D": (30, "30 Tage"), "W": (13, "13 Wochen"), "M": (12, "12 Monate")}
+
+
+@timed()
+def daily_series(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flüge und CO₂ (kg) pro Kalendertag, lückenlos vom ersten bis zum letzten Flugtag
+    (Tage ohne Flug = 0). Ein Durchgang über die Flüge per np.bincount; Index: date (DatetimeIndex).
+    """
+    days = df["date"].to_numpy().astype("datetime64[D]")
+    valid = ~np.isnat(days)
+    if not valid.any():
+        return pd.DataFrame({"flights": [], "co2_kg": []}, index=pd.DatetimeIndex([], name="date"))
+
+    day_numbers = days[valid].astype("int64")
+    first = day_numbers.min()
+    offsets = day_numbers - first
+    size = int(offsets.max()) + 1
+    co2 = np.nan_to_num(df["co2_kg"].to_numpy(dtype="float64", na_value=np.nan)[valid])
+    return pd.DataFrame(
+        {
+            "flights": np.bincount(offsets, minlength=size),
+            "co2_kg": np.bincount(offsets, weights=co2, minlength=size),
+        },
+        index=pd.date_range(np.datetime64(int(first), "D"), periods=size, freq="D", name="date"),
+    )
+
+
+@timed()
+def time_series(daily: pd.DataFrame, freq: str = "D") -> pd.DataFrame:
+    """
+    Werte pro Tag ("D"), Woche ("W", ab Montag) oder Monat ("M") aus daily_series.
+    Spalten: date, flights, co2_t, co2_rolling_t (gleitende Summe, siehe ROLLING_WINDOWS),
+    co2_cumulative_t.
+    """
+    rule = RESAMPLE_RULES[freq]
+    series = daily if rule is None else daily.resample(rule, label="left", closed="left").sum()
+    out = pd.DataFrame(
+        {"flights": series["flights"].to_numpy(), "co2_t": series["co2_kg"].to_numpy() / 1000},
+        index=series.index,
+    )
+    window, _ = ROLLING_WINDOWS[freq]
+    out["co2_rolling_t"] = out["co2_t"].rolling(window, min_periods=1).sum()
+    out["co2_cumulative_t"] = out["co2_t"].cumsum()
+    return out.reset_index()
+
+
+@timed()
+def downsample_minmax(series: pd.DataFrame, columns: list[str], max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Dünnt eine sortierte Zeitreihe auf höchstens max_points Zeilen aus: die Zeilen werden in
+    gleich große Fenster geteilt, pro Fenster bleiben die Zeilen mit Minimum und Maximum jeder
+    Spalte (dazu erste und letzte Zeile). Kürzere Reihen bleiben unverändert.
+    """
+    n = len(series)
+    if n <= max_points:
+        return series
+
+    n_buckets = max((max_points - 2) // (2 * len(columns)), 1)
+    bucket = np.arange(n) * n_buckets // n
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    for col in columns:
+        grouped = pd.Series(series[col].to_numpy(dtype="float64", na_value=np.nan)).fillna(0).groupby(bucket)
+        keep[grouped.idxmin().to_numpy()] = True
+        keep[grouped.idxmax().to_numpy()] = True
+    return series.take(np.flatnonzero(keep))
@@ -0,0 +1,160 @@
+"""
+Reisen und Umläufe aus Einzelflügen rekonstruieren (vektorisiert, ohne Schleife über Flüge).
+
+    legs = link_legs(df)      # Flüge pro Flugzeug sortiert, mit trip_id, rotation_id, ground_h, empty_leg
+    trips = build_trips(legs) # eine Zeile pro Reise (Heimatbasis → … → Heimatbasis)
+
+Umlauf: ununterbrochene Kette von Flügen eines Flugzeugs (Start = Ziel des Vorflugs).
+Reise: Abschnitt eines Umlaufs, der an der Heimatbasis beginnt (häufigster Flughafen des Flugzeugs).
+"""
+import numpy as np
+import pandas as pd
+
+from src.instrument import timed
+
+# Leerflug-Heuristik: Hin und sofort zurück (A → B → A) mit höchstens so viel Bodenzeit in B.
+# Einer der beiden Flüge ist dann sehr wahrscheinlich leer (Absetzen bzw. Abholen) – gezählt wird der Rückflug.
+# Ausnahme: Liegt A oder B an der Heimatbasis, ist das eine gewöhnliche Heimkehr bzw. Abreise, kein Leerflug.
+REPOSITION_MAX_GROUND_H = 24
+
+LEG_COLUMNS = ["tail", "date", "origin", "destination", "distance_km", "flight_time_min", "co2_kg",
+               "orig_lat", "orig_lon", "dest_lat", "dest_lon"]
+
+
+def _airport_codes(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    Start/Ziel als gemeinsame Ganzzahl-Codes (fehlend = -1), damit Vergleiche über Zeilen billig sind.
+    Bei kompakten Frames (build_airport_dim) sind das direkt die Kategorie-Codes.
+    """
+    origin, destination = df["origin"], df["destination"]
+    if (
+        isinstance(origin.dtype, pd.CategoricalDtype)
+        and isinstance(destination.dtype, pd.CategoricalDtype)
+        and origin.cat.categories.equals(destination.cat.categories)
+    ):
+        return origin.cat.codes.to_numpy(), destination.cat.codes.to_numpy(), pd.Index(origin.cat.categories)
+    codes, labels = pd.factorize(pd.concat([origin.astype(object), destination.astype(object)], ignore_index=True))
+    return codes[:len(df)], codes[len(df):], pd.Index(labels)
+
+
+def _home_bases(tail_codes: np.ndarray, origin: np.ndarray, destination: np.ndarray, n_tails: int) -> np.ndarray:
+    # Häufigster Flughafen (Start oder Ziel) pro Flugzeug, bei Gleichstand der mit dem kleineren Code
+    tails = np.concatenate([tail_codes, tail_codes])
+    airports = np.concatenate([origin, destination])
+    known = airports >= 0
+    pairs = pd.DataFrame({"tail": tails[known], "airport": airports[known]})
+    counts = pairs.value_counts().reset_index(name="n").sort_values(["tail", "n", "airport"], ascending=[True, False, True])
+    home = np.full(n_tails, -1, dtype="int64")
+    first = counts.drop_duplicates("tail")
+    home[first["tail"].to_numpy()] = first["airport"].to_numpy()
+    return home
+
+
+@timed()
+def link_legs(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sortiert die Flüge einmal nach Flugzeug und Datum und verknüpft aufeinanderfolgende Flüge:
+    connected (Start = Ziel des Vorflugs), rotation_id, trip_id, home (Heimatbasis),
+    ground_h (Bodenzeit am Ziel bis zum nächsten Flug, in Stunden) und empty_leg (Leerflug-Heuristik).
+    Ohne Spalte tail gelten alle Flüge als ein Flugzeug. Bei Daten ohne Uhrzeit ist die
+    Bodenzeit nur tagesgenau.
+    """
+    n = len(df)
+    tails = df["tail"] if "tail" in df.columns else pd.Series("", index=df.index)
+    tail_codes, tail_labels = pd.factorize(tails, use_na_sentinel=False)
+    origin, destination, labels = _airport_codes(df)
+
+    # Einmal sortieren: Flugzeug, Datum, bei gleichem Tag die Reihenfolge in der Datei
+    order = np.lexsort((np.arange(n), df["date"].to_numpy(), tail_codes))
+    tail_codes, origin, destination = tail_codes[order], origin[order], destination[order]
+    legs = df.take(order)[[c for c in LEG_COLUMNS if c in df.columns]].reset_index(drop=True)
+    if "tail" not in legs.columns:
+        legs.insert(0, "tail", pd.Categorical([""] * n))
+
+    # Vorflug desselben Flugzeugs per Verschiebung um eine Zeile
+    same_tail = np.zeros(n, dtype=bool)
+    same_tail[1:] = tail_codes[1:] == tail_codes[:-1]
+    connected = np.zeros(n, dtype=bool)
+    connected[1:] = same_tail[1:] & (origin[1:] == destination[:-1]) & (origin[1:] >= 0)
+
+    home = _home_bases(tail_codes, origin, destination, len(tail_labels))[tail_codes]
+    rotation_start = ~connected
+    trip_start = rotation_start | (origin == home)
+    legs["rotation_id"] = np.cumsum(rotation_start) - 1
+    legs["trip_id"] = np.cumsum(trip_start) - 1
+    legs["connected"] = connected
+    legs["home"] = pd.Categorical.from_codes(np.where(home >= 0, home, -1), categories=labels)
+
+    # Bodenzeit: Abflug des nächsten Flugs minus Ankunft (Abflug + Flugdauer) dieses Flugs
+    departure = legs["date"].to_numpy().astype("datetime64[s]")
+    minutes = legs["flight_time_min"].to_numpy(dtype="float64", na_value=np.nan) if "flight_time_min" in legs else np.zeros(n)
+    arrival = departure + (np.nan_to_num(minutes) * 60).astype("timedelta64[s]")
+    ground_h = np.full(n, np.nan)
+    ground_h[:-1] = (departure[1:] - arrival[:-1]).astype("float64") / 3600
+    ground_h[:-1][~connected[1:]] = np.nan  # anderes Flugzeug oder fehlender Flug dazwischen
+    legs["ground_h"] = np.clip(ground_h, 0, None)
+
+    # Leerflug: Rückflug eines schnellen Hin und Zurück (A → B, kurz am Boden, B → A) abseits der Heimatbasis
+    empty = np.zeros(n, dtype=bool)
+    empty[1:] = (
+        connected[1:]
+        & (destination[1:] == origin[:-1])
+        & (origin[1:] != destination[1:])
+        & (origin[:-1] != home[1:])
+        & (origin[1:] != home[1:])
+        & (legs["ground_h"].to_numpy()[:-1] <= REPOSITION_MAX_GROUND_H)
+    )
+    legs["empty_leg"] = empty
+    return legs
+
+
+@timed()
+def build_trips(legs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Eine Zeile pro Reise (aus link_legs): Start, Umkehrpunkt (am weitesten entfernter Zielflughafen),
+    Zeitraum, Anzahl Flüge/Leerflüge, Distanz, CO₂ (gesamt und davon Leerflüge), Bodenzeit
+    unterwegs (ohne die Standzeit nach der Rückkehr) und closed (endet wieder am Startflughafen).
+    Koordinaten (Start, Umkehrpunkt) nur, wenn die Flüge welche haben – sonst über join_coords.
+    """
+    trip = legs["trip_id"].to_numpy()
+    last_leg = np.ones(len(legs), dtype=bool)
+    last_leg[:-1] = trip[1:] != trip[:-1]
+
+    # Umkehrpunkt: Flug mit der größten Distanz innerhalb der Reise
+    distance = legs["distance_km"].to_numpy(dtype="float64", na_value=np.nan)
+    farthest = (
+        pd.Series(np.nan_to_num(distance, nan=-1.0)).groupby(trip, sort=False).idxmax().to_numpy()
+    )
+
+    co2 = legs["co2_kg"].to_numpy(dtype="float64", na_value=np.nan)
+    per_leg = pd.DataFrame({
+        "trip_id": trip,
+        "legs": 1,
+        "empty_legs": legs["empty_leg"].to_numpy(dtype="int64"),
+        "distance_km": distance,
+        "flight_time_min": legs["flight_time_min"].to_numpy(dtype="float64", na_value=np.nan),
+        "co2_kg": co2,
+        "co2_empty_kg": np.where(legs["empty_leg"].to_numpy(), co2, 0.0),
+        "ground_h": np.where(last_leg, 0.0, legs["ground_h"].fillna(0).to_numpy()),
+    })
+    sums = per_leg.groupby("trip_id", sort=True).sum()
+
+    firsts = legs.drop_duplicates("trip_id", keep="first").set_index("trip_id")
+    lasts = legs[last_leg].set_index("trip_id")
+    trips = pd.DataFrame({
+        "tail": firsts["tail"],
+        "start": firsts["date"],
+        "end": lasts["date"],
+        "origin": firsts["origin"],
+        "destination": legs["destination"].take(farthest).to_numpy(),
+        "closed": lasts["destination"].astype(object) == firsts["origin"].astype(object),
+    })
+    if "orig_lat" in legs.columns:
+        for col in ["orig_lat", "orig_lon"]:
+            trips[col] = firsts[col]
+        for col in ["dest_lat", "dest_lon"]:
+            trips[col] = legs[col].take(farthest).to_numpy()
+    trips = trips.join(sums)
+    trips["destination"] = trips["destination"].astype(legs["destination"].dtype)
+    trips["days"] = (trips["end"] - trips["start"]).dt.days + 1
+    return trips.reset_index()
@@ -2,37 +2,168 @@ import pydeck as pdk
 import altair as alt
 import pandas as pd
 
-def make_map(df: pd.DataFrame):
-    layer = pdk.Layer(
-    "ArcLayer",
-    data=df.sample(min(len(df), 300), random_state=1),
-    get_source_position=["orig_lon", "orig_lat"],
-    get_target_position=["dest_lon", "dest_lat"],
+from src.cache import LRUCache
+from src.data import COORD_COLUMNS, COORD_DECIMALS, join_coords
+from src.metrics import flights_per_month, co2_per_year
+from src.instrument import timed
+from src.trips import build_trips, link_legs
+
+# Fertig serialisierte Karten/Diagramme pro (Art, Datensatz, Filter) – prozessweit, also für alle Sessions
+SPEC_CACHE = LRUCache(max_entries=64)
+
+# Bis zu so vielen Flügen werden Einzelbögen gezeichnet, darüber aggregierte Routen
+MAP_DETAIL_MAX_FLIGHTS = 300
+
+# Nur diese Spalten gehen an den Browser (Layer + Tooltip)
+MAP_FLIGHT_COLUMNS = ["origin", "destination", "distance_km", "co2_kg", "date_str",
+                      "orig_lat", "orig_lon", "dest_lat", "dest_lon"]
+
+@timed()
+def aggregate_routes(df: pd.DataFrame, airports: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Fasst Flüge zu eindeutigen Start/Ziel-Paaren zusammen (Anzahl, CO₂-Summe)
+    und berechnet Bogenbreite und -farbe nach Verkehrsaufkommen.
+    Mit airports (build_airport_dim) werden Koordinaten erst für die Routen ergänzt.
+    """
+    agg = {
+        "flights": ("co2_kg", "size"),
+        "co2_kg": ("co2_kg", "sum"),
+        "distance_km": ("distance_km", "mean"),
+    }
+    if airports is None:
+        agg.update({c: (c, "first") for c in COORD_COLUMNS})
+
+    routes = df.groupby(["origin", "destination"], observed=True, sort=False).agg(**agg).reset_index()
+    if airports is not None:
+        routes = join_coords(routes, airports)
+    routes["co2_t"] = (routes["co2_kg"] / 1000).round(1)
+    routes["distance_km"] = routes["distance_km"].round(0)
+    _style_arcs(routes, "flights")
+    return routes.drop(columns=["co2_kg"])
+
+def _style_arcs(routes: pd.DataFrame, count_col: str) -> None:
+    # Breite ~ Wurzel der Anzahl (1–12 px), Farbe von grün (wenig CO₂) nach rot (viel CO₂)
+    share = routes[count_col] / max(routes[count_col].max(), 1)
+    routes["width"] = (1 + 11 * share**0.5).round(1)
+    co2_share = (routes["co2_kg"] / max(routes["co2_kg"].max(), 1)).to_numpy()
+    routes["color"] = [[int(255 * s), int(200 * (1 - s)), 0, 180] for s in co2_share]
+
+@timed()
+def aggregate_trips(trips: pd.DataFrame, airports: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Fasst Reisen (src.trips.build_trips) pro Start und Umkehrpunkt zusammen:
+    Anzahl, CO₂ gesamt und davon Leerflüge, Ø Bodenzeit unterwegs.
+    """
+    agg = {
+        "trips": ("trip_id", "size"),
+        "co2_kg": ("co2_kg", "sum"),
+        "co2_empty_kg": ("co2_empty_kg", "sum"),
+        "ground_h": ("ground_h", "mean"),
+    }
+    if airports is None:
+        agg.update({c: (c, "first") for c in COORD_COLUMNS})
+
+    routes = trips.groupby(["origin", "destination"], observed=True, sort=False).agg(**agg).reset_index()
+    if airports is not None:
+        routes = join_coords(routes, airports)
+    routes["co2_t"] = (routes["co2_kg"] / 1000).round(1)
+    routes["co2_empty_t"] = (routes["co2_empty_kg"] / 1000).round(1)
+    routes["ground_h"] = routes["ground_h"].round(0)
+    _style_arcs(routes, "trips")
+    return routes.drop(columns=["co2_kg", "co2_empty_kg"])
 
-    # ✅ Farbe: Grün (RGB + Alpha)
-    get_source_color=[0, 200, 0, 160],
-    get_target_color=[0, 200, 0, 160],
+@timed()
+def map_layer_data(
+    df: pd.DataFrame,
+    mode: str = "auto",
+    airports: pd.DataFrame | None = None,
+    trips: pd.DataFrame | None = None,
+) -> dict:
+    """
+    Der teure Teil der Karte: Bögen (ausgewählt bzw. aggregiert) als fertige Datensätze für den
+    Layer, dazu Breite, Farbe und Tooltip – cachebar, build_deck baut daraus billig die Karte.
+    mode: "flights" (Einzelflüge), "routes" (aggregiert), "trips" (Reisen: Start → Umkehrpunkt)
+    oder "auto" – Einzelflüge bis MAP_DETAIL_MAX_FLIGHTS, sonst Routen.
+    airports: Flughafen-Dimension, falls df keine Koordinaten enthält (build_airport_dim).
+    trips: bereits berechnete Reisen zu df (sonst werden sie hier rekonstruiert).
+    """
+    if mode == "auto":
+        mode = "flights" if len(df) <= MAP_DETAIL_MAX_FLIGHTS else "routes"
 
-    get_width=2,
-    pickable=True,
-    auto_highlight=True,
-)
+    if mode == "trips":
+        data = aggregate_trips(build_trips(link_legs(df)) if trips is None else trips, airports)
+        width, color = "width", "color"
+        tooltip_html = ("<b>{origin}</b> ⇄ <b>{destination}</b><br/>"
+                        "Reisen: {trips}<br/>"
+                        "CO₂ gesamt: {co2_t} t<br/>"
+                        "davon Leerflüge: {co2_empty_t} t<br/>"
+                        "Ø Bodenzeit unterwegs: {ground_h} h")
+    elif mode == "routes":
+        data = aggregate_routes(df, airports)
+        width, color = "width", "color"
+        tooltip_html = ("<b>{origin}</b> → <b>{destination}</b><br/>"
+                        "Flüge: {flights}<br/>"
+                        "Distanz: {distance_km} km<br/>"
+                        "CO₂ gesamt: {co2_t} t")
+    else:
+        data = df[[c for c in MAP_FLIGHT_COLUMNS if c in df.columns]]
+        if len(data) > MAP_DETAIL_MAX_FLIGHTS:
+            data = data.sample(MAP_DETAIL_MAX_FLIGHTS, random_state=1)
+        if airports is not None:
+            data = join_coords(data, airports)
+        # ✅ Farbe: Grün (RGB + Alpha)
+        width, color = 2, [0, 200, 0, 160]
+        tooltip_html = ("<b>{origin}</b> → <b>{destination}</b><br/>"
+                        "Distanz: {distance_km} km<br/>"
+                        "CO₂: {co2_kg} kg<br/>"
+                        "Datum: {date_str}")
 
+    # Koordinaten aus kompakten (float32) Frames sonst mit ~17 Stellen im JSON
+    data = data.assign(**{c: data[c].astype("float64").round(COORD_DECIMALS) for c in COORD_COLUMNS if c in data.columns})
+    return {"data": data.to_dict(orient="records"), "width": width, "color": color, "tooltip_html": tooltip_html}
+
+def build_deck(layer_data: dict) -> pdk.Deck:
+    """
+    Karte aus map_layer_data (ohne erneute Aggregation).
+    """
+    layer = pdk.Layer(
+        "ArcLayer",
+        data=layer_data["data"],
+        get_source_position=["orig_lon", "orig_lat"],
+        get_target_position=["dest_lon", "dest_lat"],
+        get_source_color=layer_data["color"],
+        get_target_color=layer_data["color"],
+        get_width=layer_data["width"],
+        pickable=True,
+        auto_highlight=True,
+    )
 
     view_state = pdk.ViewState(latitude=50.5, longitude=10.5, zoom=3.4, pitch=30)
 
     tooltip = {
-        "html": "<b>{origin}</b> → <b>{destination}</b><br/>"
-                "Distanz: {distance_km} km<br/>"
-                "CO₂: {co2_kg} kg<br/>"
-                "Datum: {date_str}",
+        "html": layer_data["tooltip_html"],
         "style": {"fontSize": "12px"},
     }
 
     return pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip=tooltip)
 
+def make_map(
+    df: pd.DataFrame,
+    mode: str = "auto",
+    airports: pd.DataFrame | None = None,
+    trips: pd.DataFrame | None = None,
+) -> pdk.Deck:
+    """
+    Karte in einem Schritt (Parameter siehe map_layer_data).
+    """
+    return build_deck(map_layer_data(df, mode=mode, airports=airports, trips=trips))
+
+@timed()
 def chart_flights_per_month(df: pd.DataFrame):
-    flights_month = df.groupby("month").size().reset_index(name="flights")
+    """
+    df: Einzelflüge oder Cube aus build_cube
+    """
+    flights_month = flights_per_month(df)
     return (
         alt.Chart(flights_month)
         .mark_line(point=True)
@@ -44,8 +175,12 @@ def chart_flights_per_month(df: pd.DataFrame):
         .properties(height=280)
     )
 
+@timed()
 def chart_co2_by_year(df: pd.DataFrame):
-    co2_year = df.groupby("year")["co2_kg"].sum().reset_index()
+    """
+    df: Einzelflüge oder Cube aus build_cube
+    """
+    co2_year = co2_per_year(df)
     co2_year["co2_t"] = co2_year["co2_kg"] / 1000
     return (
         alt.Chart(co2_year)
@@ -57,3 +192,33 @@ def chart_co2_by_year(df: pd.DataFrame):
         )
         .properties(height=280)
     )
+
+@timed()
+def chart_co2_timeline(series: pd.DataFrame, period_label: str, window_label: str):
+    """
+    series: time_series (ggf. mit downsample_minmax ausgedünnt).
+    CO₂ pro Zeitraum und gleitende Summe (linke Achse), kumuliertes CO₂ gestrichelt (rechte Achse).
+    """
+    labels = {"co2_t": f"pro {period_label}", "co2_rolling_t": f"gleitende Summe ({window_label})"}
+    # Nur die gezeichneten Spalten, gerundet – hält die eingebetteten Daten klein
+    data = series[["date", "co2_t", "co2_rolling_t", "co2_cumulative_t"]].round(
+        {"co2_t": 2, "co2_rolling_t": 2, "co2_cumulative_t": 2}
+    )
+    base = alt.Chart(data).encode(x=alt.X("date:T", title=None))
+
+    # Beide Reihen aus denselben Zeilen falten statt die Daten doppelt zu schicken
+    periods = (
+        base.transform_fold(list(labels), as_=["reihe", "co2"])
+        .transform_calculate(reihe=f"datum.reihe == 'co2_t' ? '{labels['co2_t']}' : '{labels['co2_rolling_t']}'")
+        .mark_line(strokeWidth=1.5)
+        .encode(
+            y=alt.Y("co2:Q", title="CO₂ (t)"),
+            color=alt.Color("reihe:N", title=None, legend=alt.Legend(orient="top")),
+            tooltip=[alt.Tooltip("date:T", title="Datum"), "reihe:N", alt.Tooltip("co2:Q", format=",.1f")],
+        )
+    )
+    cumulative = base.mark_line(strokeDash=[4, 3], color="gray").encode(
+        y=alt.Y("co2_cumulative_t:Q", title="CO₂ kumuliert (t)"),
+        tooltip=[alt.Tooltip("date:T", title="Datum"), alt.Tooltip("co2_cumulative_t:Q", title="kumuliert", format=",.0f")],
+    )
+    return alt.layer(periods, cumulative).resolve_scale(y="independent").properties(height=300)
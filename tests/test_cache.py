@@ -0,0 +1,29 @@
+import pandas as pd
+
+from src.cache import LRUCache, value_nbytes
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"x": range(rows)}, dtype="int64")
+
+
+def test_evicts_by_bytes_oldest_first():
+    frame_bytes = value_nbytes(_frame(1000))
+    evicted = []
+    cache = LRUCache(max_entries=100, max_bytes=int(frame_bytes * 2.5), on_evict=lambda k, v: evicted.append(k))
+    for key in "abc":
+        cache.get_or_build(key, lambda: _frame(1000))
+    assert evicted == ["a"]
+    assert len(cache) == 2 and cache.nbytes == 2 * frame_bytes
+
+    # Kleine Einträge verdrängen die großen kaum; der neueste bleibt auch über dem Limit
+    cache.get_or_build("small", lambda: (_frame(1), {"n": 1}))
+    assert "c" in cache
+    cache.get_or_build("huge", lambda: _frame(100_000))
+    assert list("bc") == evicted[1:3] and "huge" in cache
+
+
+def test_nested_values_are_counted():
+    df = _frame(10)
+    assert value_nbytes(({"report": True}, df, [df])) == 2 * value_nbytes(df)
+    assert value_nbytes("text") == 0
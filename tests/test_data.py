@@ -0,0 +1,74 @@
+import io
+
+import pandas as pd
+
+from src.data import finalize_df, read_csv_any, sniff_csv, stream_csv_to_parquet
+from src.geo import load_airport_reference
+
+GERMAN_CSV = (
+    "date;origin;destination;distance_km;flight_time_min;co2_kg;orig_lat;orig_lon;dest_lat;dest_lon\n"
+    "04.03.2024;Toronto (YYZ);Miami (OPF);1.980;190;18.500;43,6777;-79,6248;25,9070;-80,2784\n"
+    "13.03.2024;Miami (OPF);Toronto (YYZ);1.980;185;18.200;25,9070;-80,2784;43,6777;-79,6248\n"
+)
+
+
+def test_german_dates_are_day_first():
+    # 04.03.2024 ist mehrdeutig: gemeint ist der 4. März, nicht der 3. April
+    df = finalize_df(read_csv_any(io.BytesIO(GERMAN_CSV.encode("utf-8"))))
+    assert list(df["date"]) == [pd.Timestamp("2024-03-04"), pd.Timestamp("2024-03-13")]
+    assert list(df["distance_km"]) == [1980, 1980]
+
+
+def test_iso_dates_unchanged():
+    csv = GERMAN_CSV.replace("04.03.2024", "2024-03-04").replace("13.03.2024", "2024-03-13")
+    df = finalize_df(read_csv_any(io.BytesIO(csv.encode("utf-8"))))
+    assert list(df["date"]) == [pd.Timestamp("2024-03-04"), pd.Timestamp("2024-03-13")]
+
+
+def test_stream_keeps_fractions_after_whole_number_chunks(tmp_path):
+    # Erster Block nur ganze Zahlen, zweiter mit Nachkommastellen: darf nicht am Schema des ersten scheitern
+    header = "date,origin,destination,distance_km,flight_time_min,co2_kg,orig_lat,orig_lon,dest_lat,dest_lon\n"
+    rows = [f"2024-03-0{d},Toronto (YYZ),Miami (OPF),1980,190,18500,43.6777,-79.6248,25.9070,-80.2784\n" for d in (1, 2)]
+    rows.append("2024-03-03,Miami (OPF),Toronto (YYZ),1980.5,185.5,18200.25,25.9070,-80.2784,43.6777,-79.6248\n")
+    dest = tmp_path / "stream.parquet"
+    ok, errors, written = stream_csv_to_parquet(io.BytesIO((header + "".join(rows)).encode()), str(dest), {}, chunk_rows=2)
+    assert ok, errors
+    assert written == 3
+    df = pd.read_parquet(dest)
+    assert df["distance_km"].tolist() == [1980.0, 1980.0, 1980.5]
+    assert df["co2_kg"].iloc[-1] == 18200.25
+
+
+def test_semicolon_file_with_dotted_dates_uses_german_thousands():
+    # Keine Kommazahl im Ausschnitt: "18.500" ist allein mehrdeutig, ";" + "04.03.2024" entscheidet
+    csv = (
+        "date;origin;destination;distance_km;flight_time_min;co2_kg\n"
+        "04.03.2024;Toronto (YYZ);Miami (OPF);1.980;190;18.500\n"
+        "13.03.2024;Miami (OPF);Toronto (YYZ);1.980;185;18.200\n"
+    ).encode("utf-8")
+    assert sniff_csv(io.BytesIO(csv)) == {"sep": ";", "encoding": "utf-8", "decimal": ",", "thousands": "."}
+    df = read_csv_any(io.BytesIO(csv))
+    assert df["co2_kg"].tolist() == [18500, 18200]
+    assert df["distance_km"].tolist() == [1980, 1980]
+
+
+def test_finalize_df_uses_passed_airport_reference(tmp_path):
+    reference_csv = tmp_path / "airports.csv"
+    reference_csv.write_text(
+        "ident,iata_code,name,latitude_deg,longitude_deg\n"
+        "KEGE,EGE,Eagle County Regional Airport,39.6426,-106.9177\n"
+        "KSUN,SUN,Friedman Memorial Airport,43.5044,-114.2962\n"
+    )
+    reference = load_airport_reference(str(reference_csv))
+    raw = pd.DataFrame({
+        "date": ["2024-03-04"],
+        "origin": ["Vail (EGE)"],
+        "destination": [None],
+        "orig_lat": [None], "orig_lon": [None],
+        "dest_lat": [43.5050], "dest_lon": [-114.2960],
+    })
+    df = finalize_df(raw, airports=reference)
+    assert (df["orig_lat"].iloc[0], df["orig_lon"].iloc[0]) == (39.6426, -106.9177)
+    assert df["destination"].iloc[0] == "Friedman Memorial Airport (SUN)"
+    # Ohne Referenz kennt die eingebaute Tabelle beide Flughäfen nicht
+    assert finalize_df(raw).empty
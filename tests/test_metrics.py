@@ -0,0 +1,36 @@
+import pandas as pd
+
+from src.data import append_flights, concat_frames, finalize_df
+from src.metrics import CUBE_DIMENSIONS, build_cube, update_cube
+from src.synth import generate_flights
+
+
+def _sorted(cube: pd.DataFrame) -> pd.DataFrame:
+    cube = cube.astype({c: str for c in CUBE_DIMENSIONS})
+    return cube.sort_values(CUBE_DIMENSIONS).reset_index(drop=True)
+
+
+def test_update_cube_matches_full_build():
+    flights = finalize_df(generate_flights(600, seed=3))
+    old, new = flights.iloc[:400], flights.iloc[400:]
+    pd.testing.assert_frame_equal(
+        _sorted(update_cube(build_cube(old), new)),
+        _sorted(build_cube(concat_frames([old, new]))),
+        check_dtype=False,
+    )
+
+
+def test_append_flights_drops_duplicates():
+    flights = finalize_df(generate_flights(300, seed=4))
+    existing = flights.iloc[:200]
+    # 50 Flüge schon vorhanden, 100 neu, davon 10 im Block doppelt
+    batch = pd.concat([flights.iloc[150:300], flights.iloc[250:260]])
+    batch = batch[["date", "origin", "destination", "tail", "distance_km", "flight_time_min", "co2_kg",
+                   "orig_lat", "orig_lon", "dest_lat", "dest_lon"]].astype({"origin": str, "destination": str})
+    combined, added, _, report = append_flights(existing, batch)
+    assert report["ok"]
+    assert (report["added"], report["duplicates"]) == (100, 60)
+    assert len(added) == 100 and len(combined) == 300
+    pd.testing.assert_frame_equal(
+        _sorted(update_cube(build_cube(existing), added)), _sorted(build_cube(combined)), check_dtype=False
+    )
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from src.data import finalize_df, load_flights_query, make_query, query_frame
+from src.synth import generate_flights
+
+QUERY = make_query(years=(2023, 2023), distance_km=(500, 3000))
+
+
+@pytest.fixture(scope="module")
+def flights_parquet(tmp_path_factory):
+    df = finalize_df(generate_flights(2000, seed=1))
+    path = tmp_path_factory.mktemp("query") / "flights.parquet"
+    df.to_parquet(path, engine="pyarrow", index=False)
+    return str(path), df
+
+
+def _rows(df: pd.DataFrame) -> pd.DataFrame:
+    cols = ["date", "distance_km", "co2_kg"]
+    return df[cols].sort_values(cols).reset_index(drop=True)
+
+
+def test_pyarrow_pushdown_matches_in_memory_filter(flights_parquet):
+    path, df = flights_parquet
+    loaded = load_flights_query(path, QUERY, engine="pyarrow")
+    assert len(loaded) > 0
+    pd.testing.assert_frame_equal(_rows(loaded), _rows(query_frame(df, QUERY)), check_dtype=False)
+
+
+def test_duckdb_pushdown_matches_pyarrow(flights_parquet):
+    pytest.importorskip("duckdb")
+    path, df = flights_parquet
+    query = dict(QUERY, origins=[df["origin"].iloc[0]])
+    loaded = load_flights_query(path, query, engine="duckdb")
+    expected = load_flights_query(path, query, engine="pyarrow")
+    assert len(loaded) > 0
+    pd.testing.assert_frame_equal(_rows(loaded), _rows(expected), check_dtype=False)
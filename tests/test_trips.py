@@ -0,0 +1,35 @@
+import pandas as pd
+
+from src.trips import link_legs
+
+
+def _legs(rows: list[tuple[str, str, str]]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["date", "origin", "destination"])
+    df["date"] = pd.to_datetime(df["date"])
+    df["tail"] = "N767CJ"
+    df["flight_time_min"] = 90.0
+    return df
+
+
+def test_return_to_home_base_is_not_an_empty_leg():
+    # Heimatbasis YYZ: TEB → YYZ und am nächsten Tag wieder YYZ → TEB ist eine gewöhnliche Reise
+    legs = link_legs(_legs([
+        ("2024-03-01", "Toronto (YYZ)", "New York (TEB)"),
+        ("2024-03-04", "New York (TEB)", "Toronto (YYZ)"),
+        ("2024-03-05", "Toronto (YYZ)", "New York (TEB)"),
+        ("2024-03-08", "New York (TEB)", "Toronto (YYZ)"),
+    ]))
+    assert (legs["home"] == "Toronto (YYZ)").all()
+    assert not legs["empty_leg"].any()
+
+
+def test_quick_out_and_back_away_from_home_is_an_empty_leg():
+    legs = link_legs(_legs([
+        ("2024-03-01", "Toronto (YYZ)", "New York (TEB)"),
+        ("2024-03-02", "New York (TEB)", "Miami (OPF)"),
+        ("2024-03-02", "Miami (OPF)", "New York (TEB)"),
+        ("2024-03-06", "New York (TEB)", "Toronto (YYZ)"),
+        ("2024-03-09", "Toronto (YYZ)", "Montreal (YUL)"),
+        ("2024-03-12", "Montreal (YUL)", "Toronto (YYZ)"),
+    ]))
+    assert legs["empty_leg"].tolist() == [False, False, True, False, False, False]